@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Tuple
+from typing import FrozenSet
 
 # Optional local .env support (Render uses Dashboard env vars)
 try:
@@ -16,33 +16,40 @@ def _load_dotenv_if_present() -> None:
         load_dotenv()
 
 
+_load_dotenv_if_present()
+
+# Snapshot of the environment (after .env) so lookups are plain dict reads
+_ENV = dict(os.environ)
+
+
 def _get_env(name: str, default: str | None = None) -> str:
-    val = os.getenv(name, default)
+    val = _ENV.get(name, default)
     return (val or "").strip()
 
 
-def _parse_admin_ids(raw: str) -> Tuple[int, ...]:
+def _parse_admin_ids(raw: str) -> FrozenSet[int]:
     raw = (raw or "").strip()
     if not raw:
         raise RuntimeError("ADMIN_IDS is not set. Example: ADMIN_IDS=123,456")
 
-    ids: list[int] = []
-    for part in raw.split(","):
-        part = part.strip()
-        if not part:
-            continue
-        if not part.isdigit():
-            raise RuntimeError(f"ADMIN_IDS contains non-numeric value: {part}")
-        ids.append(int(part))
+    parts = [p for p in (p.strip() for p in raw.split(",")) if p]
+    # one try around the whole generator: int() both validates and converts
+    try:
+        ids = frozenset(int(p) for p in parts)
+    except ValueError:
+        # rare error path: find the offending token for the message
+        bad = next((p for p in parts if not p.lstrip("+-").isdigit()), raw)
+        raise RuntimeError(f"ADMIN_IDS contains non-numeric value: {bad}") from None
     if not ids:
         raise RuntimeError("ADMIN_IDS is empty after parsing")
-    return tuple(ids)
+    return ids
 
 
-@dataclass(frozen=True)
+# singleton config: no generated __eq__/__hash__/__repr__ (repr would also leak bot_token)
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
 class Settings:
     bot_token: str
-    admin_ids: Tuple[int, ...]
+    admin_ids: FrozenSet[int]  # frozenset: O(1) `user_id in settings.admin_ids`
 
     # UI / branding
     shop_name: str = "CYRULNYA"
@@ -55,8 +62,6 @@ class Settings:
 
     @classmethod
     def from_env(cls) -> "Settings":
-        _load_dotenv_if_present()
-
         token = _get_env("BOT_TOKEN")
         if not token:
             raise RuntimeError("BOT_TOKEN is not set")
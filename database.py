@@ -1,259 +1,505 @@
 from __future__ import annotations
 
+import asyncio
+import time
 import aiosqlite
+from bisect import bisect_left
+from contextlib import asynccontextmanager
 from datetime import date, datetime
-from typing import List, Dict, Optional, Tuple, Any
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, NamedTuple, Optional, Sequence, Tuple, Any
 
 DB_PATH = "barber.db"
 
+# Одне спільне з'єднання на процес (замість connect() на кожен запит).
+_db: aiosqlite.Connection | None = None
+_db_lock = asyncio.Lock()
+# Серіалізує записи: інакше чужий запис потрапить у відкриту транзакцію (BEGIN IMMEDIATE)
+# іншої корутини на тому ж з'єднанні.
+_write_lock = asyncio.Lock()
+
 
 # =======================
 #  TIME HELPERS
 # =======================
 
-def _parse_hhmm(t: str) -> Tuple[int, int]:
-    h, m = t.split(":")
-    return int(h), int(m)
+@lru_cache(maxsize=1440)
+def _to_minutes(t: str) -> int:
+    # 'HH:MM' -> хвилини від півночі; різних значень не більше 1440, тому кешуємо
+    h, _, m = t.partition(":")
+    return int(h) * 60 + int(m)
 
 
-def _to_minutes(t: str) -> int:
-    h, m = _parse_hhmm(t)
-    return h * 60 + m
+# ISO UTC-час рахує сам SQLite у запиті, а не Python на кожен запис
+_SQL_UTC_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+
+# =======================
+#  CONNECTION
+# =======================
+
+async def get_db() -> aiosqlite.Connection:
+    """
+    Ледаче відкриття спільного з'єднання.
+    isolation_level=None: autocommit, транзакції відкриваємо явно (BEGIN IMMEDIATE).
+    """
+    global _db
+    if _db is not None:
+        return _db
+
+    async with _db_lock:
+        if _db is None:
+            # cached_statements: кеш підготовлених statement-ів sqlite3 (за замовчуванням 128)
+            conn = await aiosqlite.connect(DB_PATH, isolation_level=None, cached_statements=256)
+            # доступ і за індексом (r[0]), і за назвою колонки (r["start_time"])
+            conn.row_factory = aiosqlite.Row
+            await conn.execute("PRAGMA journal_mode = WAL")
+            await conn.execute("PRAGMA wal_autocheckpoint = 1000")
+            await conn.execute("PRAGMA synchronous = NORMAL")
+            # інший процес (напр. sqlite3 CLI) тримає lock -> чекаємо, а не "database is locked"
+            await conn.execute("PRAGMA busy_timeout = 5000")
+            await conn.execute("PRAGMA mmap_size = 268435456")
+            await conn.execute("PRAGMA foreign_keys = ON")
+            await conn.execute("PRAGMA temp_store = MEMORY")
+            await conn.execute("PRAGMA cache_size = -20000")
+            # схему/міграції проганяємо до публікації з'єднання: запити нижче покладаються
+            # на мігровані колонки bookings, яких нема в старих БД
+            try:
+                await _migrate(conn)
+            except BaseException:
+                await conn.close()
+                raise
+            _db = conn
+    return _db
+
+
+@asynccontextmanager
+async def _writer() -> AsyncIterator[aiosqlite.Connection]:
+    async with _write_lock:
+        yield await get_db()
+
+
+@asynccontextmanager
+async def _immediate_tx(db: aiosqlite.Connection) -> AsyncIterator[aiosqlite.Connection]:
+    """
+    BEGIN IMMEDIATE ... COMMIT, ROLLBACK при будь-якому винятку.
+    Лише всередині _writer(): з'єднання спільне, транзакцію не можна лишати відкритою.
+    """
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+    except BaseException:
+        await db.rollback()
+        raise
+    await db.commit()
+
+
+async def _iter_rows(cur: aiosqlite.Cursor, size: int = 500) -> AsyncIterator[aiosqlite.Row]:
+    """
+    Рядки порціями по size (fetchmany), а не fetchall() + ще один список поверх.
+    `async for row in cur` не підходить: він тягне по arraysize=1 рядку за перехід у потік.
+    """
+    while rows := await cur.fetchmany(size):
+        for r in rows:
+            yield r
+
+
+async def close_db() -> None:
+    global _db
+    if _db is not None:
+        await _db.close()
+        _db = None
+
+
+# =======================
+#  READ CACHES
+# =======================
+# Налаштування, графік, перерви і вихідні читаються на кожному розрахунку слотів,
+# а змінюються лише через setter-и нижче -> тримаємо їх у пам'яті, скидаємо при записі.
+
+_settings_cache: Optional[Dict[str, Any]] = None
+_schedule_cache: Optional[Dict[int, Dict[str, Any]]] = None
+_breaks_cache: Dict[int, List[Dict[str, Any]]] = {}
+_days_off_cache: Optional[set[str]] = None
+# Збільшується при кожному скиданні: читач, який почав SELECT до запису,
+# не покладе застарілий результат у кеш.
+_cache_gen = 0
 
 
-def _intervals_overlap(a_start: int, a_end: int, b_start: int, b_end: int) -> bool:
-    # [a_start, a_end) overlaps [b_start, b_end)
-    return a_start < b_end and b_start < a_end
+class _DayBookings(NamedTuple):
+    rows: List[Dict[str, Any]]  # активні броні дня, відсортовані за start_min
+    starts: List[int]           # start_min по порядку rows
+    max_ends: List[int]         # max(end_min) серед rows[:i + 1] -> перетин за O(log n)
 
 
-def _iso_utc_now() -> str:
-    return datetime.utcnow().isoformat()
+# date_str -> активні броні (pending/approved); скидається при будь-якій зміні броней
+_day_bookings_cache: Dict[str, _DayBookings] = {}
+_DAY_BOOKINGS_CACHE_MAX = 62
+# date_str -> усі броні дня для адмінських /today, /date (будь-який статус); скидається так само
+_admin_day_cache: Dict[str, List[Tuple[int, str, str, str, str]]] = {}
+# (client_id, limit) -> останні броні клієнта для "Мої записи"; скидається так само (дата тут не ключ)
+_client_bookings_cache: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+_CLIENT_BOOKINGS_CACHE_MAX = 1000
+
+# Адмінські списки перемальовуються на кожен клік пагінації -> короткий TTL.
+# (назва функції, *аргументи) -> (момент протухання по monotonic, результат)
+_admin_cache: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+_ADMIN_CACHE_TTL = 2.0
+_ADMIN_CACHE_MAX = 512
+
+
+def cache_generation() -> int:
+    """
+    Поточне покоління кешів: змінюється при кожному записі налаштувань, графіка,
+    перерв, вихідних або броней. Похідні кеші поза модулем можуть ключуватися ним.
+    """
+    return _cache_gen
+
+
+def _invalidate_settings_cache() -> None:
+    global _settings_cache, _cache_gen
+    _settings_cache = None
+    _cache_gen += 1
+
+
+def _invalidate_schedule_cache() -> None:
+    global _schedule_cache, _cache_gen
+    _schedule_cache = None
+    _cache_gen += 1
+
+
+def _invalidate_breaks_cache() -> None:
+    global _cache_gen
+    _breaks_cache.clear()
+    _cache_gen += 1
+
+
+def _invalidate_day_bookings_cache(date_str: Optional[str] = None) -> None:
+    """
+    date_str=None: скинути всі дати (коли дата зміненої броні невідома).
+    Адмінський TTL-кеш скидається повністю: він малий, а ключі — довільні діапазони дат.
+    """
+    global _cache_gen
+    if date_str is None:
+        _day_bookings_cache.clear()
+        _admin_day_cache.clear()
+    else:
+        _day_bookings_cache.pop(date_str, None)
+        _admin_day_cache.pop(date_str, None)
+    _client_bookings_cache.clear()
+    _admin_cache.clear()
+    _cache_gen += 1
+
+
+def _admin_cache_get(key: Tuple[Any, ...]) -> Any:
+    hit = _admin_cache.get(key)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+
+def _admin_cache_put(key: Tuple[Any, ...], gen: int, value: Any) -> None:
+    # порожні результати не кешуємо: щойно створений запис має з'явитися одразу
+    if value and gen == _cache_gen:
+        if len(_admin_cache) >= _ADMIN_CACHE_MAX:
+            _admin_cache.clear()
+        _admin_cache[key] = (time.monotonic() + _ADMIN_CACHE_TTL, value)
+
+
+def _cached_overlap(date_str: str, start: int, end: int) -> Optional[bool]:
+    """Чи перетинає [start, end) активну бронь; None, якщо дня нема в кеші."""
+    day = _day_bookings_cache.get(date_str)
+    if day is None:
+        return None
+    i = bisect_left(day.starts, end)  # броні з start_min < end
+    return i > 0 and day.max_ends[i - 1] > start
+
+
+def _bump_days_off_cache(date_str: str, *, off: bool) -> None:
+    global _cache_gen
+    if _days_off_cache is not None:
+        if off:
+            _days_off_cache.add(date_str)
+        else:
+            _days_off_cache.discard(date_str)
+    _cache_gen += 1
 
 
 # =======================
 #  MIGRATION HELPERS
 # =======================
 
-async def _ensure_column(db: aiosqlite.Connection, table: str, column: str, ddl_fragment: str) -> None:
+async def _table_columns(db: aiosqlite.Connection, table: str) -> set[str]:
+    # table_xinfo, бо table_info не показує generated-колонки (created_date)
+    cur = await db.execute(f"PRAGMA table_xinfo({table})")
+    return {r[1] for r in await cur.fetchall()}
+
+
+async def _ensure_column(db: aiosqlite.Connection, cols: set[str], table: str, column: str, ddl_fragment: str) -> None:
     """
+    cols: вже прочитані колонки таблиці (_table_columns), щоб не робити PRAGMA на кожну колонку.
     ddl_fragment example: "ui_message_id INTEGER"
     """
-    cur = await db.execute(f"PRAGMA table_info({table})")
-    cols = [r[1] for r in await cur.fetchall()]
     if column not in cols:
         await db.execute(f"ALTER TABLE {table} ADD COLUMN {ddl_fragment}")
+        cols.add(column)
 
 
 # =======================
 #  INIT / MIGRATIONS
 # =======================
 
-async def init_db() -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-
-        # users
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY,          -- tg_id
-                full_name TEXT,
-                phone TEXT,
-                is_admin INTEGER DEFAULT 0,
-                ui_message_id INTEGER            -- для концепції "одного повідомлення"
-            )
-            """
-        )
-        # migrations for users (older DBs may not have ui_message_id)
-        await _ensure_column(db, "users", "ui_message_id", "ui_message_id INTEGER")
-
-        # bookings
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id INTEGER,
-                date TEXT NOT NULL,                 -- 'YYYY-MM-DD'
-                time TEXT NOT NULL,                 -- 'HH:MM'
-                duration_minutes INTEGER NOT NULL,  -- тривалість послуги
-                occupy_minutes INTEGER,             -- фактична зайнятість (duration + пауза/округлення), може бути NULL
-                service_code TEXT,                  -- 'short','beard', ...
-                service_text TEXT NOT NULL,         -- назва послуги
-                price_text TEXT NOT NULL,           -- '350 грн', '350–400 грн'
-                client_name TEXT NOT NULL,
-                phone TEXT NOT NULL,
-                status TEXT NOT NULL,               -- pending/approved/completed/rejected/cancelled_*
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY (client_id) REFERENCES users(id)
-            )
-            """
-        )
-
-        # migrations for bookings (older DBs may not have occupy_minutes)
-        await _ensure_column(db, "bookings", "occupy_minutes", "occupy_minutes INTEGER")
+_SCHEMA_SQL = """
+-- users
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,          -- tg_id
+    full_name TEXT,
+    phone TEXT,
+    is_admin INTEGER DEFAULT 0,
+    ui_message_id INTEGER            -- для концепції "одного повідомлення"
+);
+
+-- bookings
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER,
+    date TEXT NOT NULL,                 -- 'YYYY-MM-DD'
+    time TEXT NOT NULL,                 -- 'HH:MM'
+    duration_minutes INTEGER NOT NULL,  -- тривалість послуги
+    occupy_minutes INTEGER,             -- фактична зайнятість (duration + пауза/округлення), може бути NULL
+    service_code TEXT,                  -- 'short','beard', ...
+    service_text TEXT NOT NULL,         -- назва послуги
+    price_text TEXT NOT NULL,           -- '350 грн', '350–400 грн'
+    client_name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    status TEXT NOT NULL,               -- pending/approved/completed/rejected/cancelled_*
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    created_date TEXT GENERATED ALWAYS AS (substr(created_at, 1, 10)) VIRTUAL,  -- 'YYYY-MM-DD' для індексу
+    -- [start_min, end_min) у хвилинах від півночі: перевірка перетину прямо в SQL
+    start_min INTEGER GENERATED ALWAYS AS (CAST(substr(time, 1, 2) AS INTEGER) * 60 + CAST(substr(time, 4, 2) AS INTEGER)) VIRTUAL,
+    end_min INTEGER GENERATED ALWAYS AS (start_min + COALESCE(occupy_minutes, duration_minutes)) VIRTUAL,
+    FOREIGN KEY (client_id) REFERENCES users(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings(date);
+CREATE INDEX IF NOT EXISTS idx_bookings_client ON bookings(client_id);
+-- покриває агрегат по клієнтах (get_clients_with_stats_admin) без читання таблиці
+CREATE INDEX IF NOT EXISTS idx_bookings_client_status ON bookings(client_id, status);
+CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status);
+CREATE INDEX IF NOT EXISTS idx_bookings_created ON bookings(created_at);
+CREATE INDEX IF NOT EXISTS idx_bookings_date_status_time ON bookings(date, status, time);
+-- status попереду: черга pending (ORDER BY date, time) і звіти по статусах без сортування
+CREATE INDEX IF NOT EXISTS idx_bookings_status_date_time ON bookings(status, date, time);
+
+-- days_off (вихідні по датах)
+CREATE TABLE IF NOT EXISTS days_off (
+    date TEXT PRIMARY KEY  -- 'YYYY-MM-DD'
+);
+
+-- shop_settings (1 row table id=1)
+CREATE TABLE IF NOT EXISTS shop_settings (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+
+    base_grid_minutes INTEGER NOT NULL DEFAULT 60,
+    short_service_threshold_minutes INTEGER NOT NULL DEFAULT 40,
+    rest_minutes_after_short INTEGER NOT NULL DEFAULT 5,
+    extra_round_minutes INTEGER NOT NULL DEFAULT 15,
+
+    min_lead_minutes INTEGER NOT NULL DEFAULT 0,
+    default_work_start TEXT NOT NULL DEFAULT '09:00',
+    default_work_end   TEXT NOT NULL DEFAULT '19:00'
+);
+INSERT OR IGNORE INTO shop_settings (id) VALUES (1);
+
+-- schedule by weekday
+CREATE TABLE IF NOT EXISTS weekly_schedule (
+    weekday INTEGER PRIMARY KEY,         -- 0=Mon ... 6=Sun
+    is_working INTEGER NOT NULL DEFAULT 1,
+    work_start TEXT NOT NULL DEFAULT '09:00',
+    work_end   TEXT NOT NULL DEFAULT '19:00'
+);
+
+-- breaks (перерви); weekday NULL = для всіх днів
+CREATE TABLE IF NOT EXISTS schedule_breaks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    weekday INTEGER NULL,
+    start_time TEXT NOT NULL,   -- 'HH:MM'
+    end_time   TEXT NOT NULL,   -- 'HH:MM'
+    is_enabled INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_breaks_weekday ON schedule_breaks(weekday);
+CREATE INDEX IF NOT EXISTS idx_breaks_enabled ON schedule_breaks(is_enabled);
+
+-- reminders (нагадування)
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id INTEGER,
+    target TEXT NOT NULL,        -- 'client' | 'master'
+    tg_id INTEGER NOT NULL,
+    remind_at TEXT NOT NULL,     -- ISO datetime (UTC recommended)
+    type TEXT NOT NULL,          -- '2h' | '30m' | ...
+    status TEXT NOT NULL DEFAULT 'pending',  -- 'pending' | 'sent' | 'canceled' | 'failed'
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY (booking_id) REFERENCES bookings(id)
+);
+-- covering для get_due_reminders: вибірка без читання рядків таблиці
+CREATE INDEX IF NOT EXISTS idx_reminders_due_covering
+    ON reminders(status, remind_at, id, booking_id, target, tg_id, type, attempts);
+DROP INDEX IF EXISTS idx_reminders_status_time;  -- префікс covering-індексу вище
+CREATE INDEX IF NOT EXISTS idx_reminders_booking ON reminders(booking_id);
+"""
+
+# migrations: older DBs may not have these columns
+_COLUMN_MIGRATIONS: Dict[str, List[Tuple[str, str]]] = {
+    "users": [
+        ("ui_message_id", "ui_message_id INTEGER"),
+    ],
+    "bookings": [
+        ("occupy_minutes", "occupy_minutes INTEGER"),
+        ("created_date", "created_date TEXT GENERATED ALWAYS AS (substr(created_at, 1, 10)) VIRTUAL"),
+        (
+            "start_min",
+            "start_min INTEGER GENERATED ALWAYS AS "
+            "(CAST(substr(time, 1, 2) AS INTEGER) * 60 + CAST(substr(time, 4, 2) AS INTEGER)) VIRTUAL",
+        ),
+        ("end_min", "end_min INTEGER GENERATED ALWAYS AS (start_min + COALESCE(occupy_minutes, duration_minutes)) VIRTUAL"),
+    ],
+    "shop_settings": [
+        ("base_grid_minutes", "base_grid_minutes INTEGER NOT NULL DEFAULT 60"),
+        ("short_service_threshold_minutes", "short_service_threshold_minutes INTEGER NOT NULL DEFAULT 40"),
+        ("rest_minutes_after_short", "rest_minutes_after_short INTEGER NOT NULL DEFAULT 5"),
+        ("extra_round_minutes", "extra_round_minutes INTEGER NOT NULL DEFAULT 15"),
+        ("min_lead_minutes", "min_lead_minutes INTEGER NOT NULL DEFAULT 0"),
+        ("default_work_start", "default_work_start TEXT NOT NULL DEFAULT '09:00'"),
+        ("default_work_end", "default_work_end TEXT NOT NULL DEFAULT '19:00'"),
+    ],
+}
+
+
+# індекси по мігрованих колонках: лише після ALTER TABLE (у старих БД колонок ще нема)
+_MIGRATED_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_bookings_client_created_date ON bookings(client_id, created_date, status)",
+    "CREATE INDEX IF NOT EXISTS idx_bookings_date_status_start ON bookings(date, status, start_min)",
+)
+
+# старі броні без occupy_minutes: рахуємо зайнятість за поточними shop_settings (як адмінка при approve)
+# duration < short_thr -> ceil(duration + rest, extra_round), інакше duration
+_BACKFILL_OCCUPY_SQL = """
+UPDATE bookings
+SET occupy_minutes = (
+    SELECT CASE
+        WHEN bookings.duration_minutes >= s.short_service_threshold_minutes
+            THEN bookings.duration_minutes
+        WHEN s.extra_round_minutes <= 0
+            THEN bookings.duration_minutes + s.rest_minutes_after_short
+        ELSE ((bookings.duration_minutes + s.rest_minutes_after_short + s.extra_round_minutes - 1)
+              / s.extra_round_minutes) * s.extra_round_minutes
+    END
+    FROM shop_settings s
+    WHERE s.id = 1
+)
+WHERE occupy_minutes IS NULL
+"""
+
+# PRAGMA user_version: збільшуй при кожній зміні _SCHEMA_SQL / _COLUMN_MIGRATIONS
+_SCHEMA_VERSION = 7
 
-        # indices
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings(date)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_client ON bookings(client_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_created ON bookings(created_at)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_date_status_time ON bookings(date, status, time)")
 
-        # days_off (вихідні по датах)
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS days_off (
-                date TEXT PRIMARY KEY  -- 'YYYY-MM-DD'
-            )
-            """
-        )
+async def init_db() -> None:
+    """Відкриває з'єднання і мігрує схему (get_db() робить це при першому виклику)."""
+    await get_db()
 
-        # shop_settings (1 row table id=1)
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS shop_settings (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
 
-                base_grid_minutes INTEGER NOT NULL DEFAULT 60,
-                short_service_threshold_minutes INTEGER NOT NULL DEFAULT 40,
-                rest_minutes_after_short INTEGER NOT NULL DEFAULT 5,
-                extra_round_minutes INTEGER NOT NULL DEFAULT 15,
+async def _migrate(db: aiosqlite.Connection) -> None:
+    # викликається лише з get_db() під _db_lock, поки з'єднання ще ніхто не бачить -> без _writer()
+    cur = await db.execute("PRAGMA user_version")
+    if int((await cur.fetchone())[0]) >= _SCHEMA_VERSION:
+        return  # схема актуальна: без DDL і PRAGMA table_xinfo
 
-                min_lead_minutes INTEGER NOT NULL DEFAULT 0,
-                default_work_start TEXT NOT NULL DEFAULT '09:00',
-                default_work_end   TEXT NOT NULL DEFAULT '19:00'
-            )
-            """
-        )
-        await db.execute("INSERT OR IGNORE INTO shop_settings (id) VALUES (1)")
-
-        # migrations for shop_settings (older DBs may not have new columns)
-        await _ensure_column(db, "shop_settings", "base_grid_minutes", "base_grid_minutes INTEGER NOT NULL DEFAULT 60")
-        await _ensure_column(
-            db,
-            "shop_settings",
-            "short_service_threshold_minutes",
-            "short_service_threshold_minutes INTEGER NOT NULL DEFAULT 40",
-        )
-        await _ensure_column(
-            db,
-            "shop_settings",
-            "rest_minutes_after_short",
-            "rest_minutes_after_short INTEGER NOT NULL DEFAULT 5",
-        )
-        await _ensure_column(
-            db,
-            "shop_settings",
-            "extra_round_minutes",
-            "extra_round_minutes INTEGER NOT NULL DEFAULT 15",
-        )
-        await _ensure_column(
-            db,
-            "shop_settings",
-            "min_lead_minutes",
-            "min_lead_minutes INTEGER NOT NULL DEFAULT 0",
-        )
-        await _ensure_column(
-            db,
-            "shop_settings",
-            "default_work_start",
-            "default_work_start TEXT NOT NULL DEFAULT '09:00'",
-        )
-        await _ensure_column(
-            db,
-            "shop_settings",
-            "default_work_end",
-            "default_work_end TEXT NOT NULL DEFAULT '19:00'",
-        )
+    # усі CREATE TABLE / INDEX одним викликом
+    await db.executescript(_SCHEMA_SQL)
 
-        # schedule by weekday
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS weekly_schedule (
-                weekday INTEGER PRIMARY KEY,         -- 0=Mon ... 6=Sun
-                is_working INTEGER NOT NULL DEFAULT 1,
-                work_start TEXT NOT NULL DEFAULT '09:00',
-                work_end   TEXT NOT NULL DEFAULT '19:00'
-            )
-            """
-        )
+    # міграції + seed однією транзакцією
+    async with _immediate_tx(db):
+        for table, columns in _COLUMN_MIGRATIONS.items():
+            cols = await _table_columns(db, table)
+            for column, ddl_fragment in columns:
+                await _ensure_column(db, cols, table, column, ddl_fragment)
+        for sql in _MIGRATED_INDEXES_SQL:
+            await db.execute(sql)
+        await db.execute(_BACKFILL_OCCUPY_SQL)
 
         # seed weekly schedule if empty
         cur = await db.execute("SELECT COUNT(*) FROM weekly_schedule")
         cnt = int((await cur.fetchone())[0] or 0)
         if cnt == 0:
             # default: Mon-Sat working, Sun off
-            for wd in range(7):
-                is_working = 0 if wd == 6 else 1
-                await db.execute(
-                    """
-                    INSERT INTO weekly_schedule (weekday, is_working, work_start, work_end)
-                    VALUES (?, ?, '09:00', '19:00')
-                    """,
-                    (wd, is_working),
-                )
-
-        # breaks (перерви)
-        # weekday NULL = для всіх днів
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS schedule_breaks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                weekday INTEGER NULL,
-                start_time TEXT NOT NULL,   -- 'HH:MM'
-                end_time   TEXT NOT NULL,   -- 'HH:MM'
-                is_enabled INTEGER NOT NULL DEFAULT 1
-            )
-            """
-        )
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_breaks_weekday ON schedule_breaks(weekday)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_breaks_enabled ON schedule_breaks(is_enabled)")
-
-        # reminders (нагадування)
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                booking_id INTEGER,
-                target TEXT NOT NULL,        -- 'client' | 'master'
-                tg_id INTEGER NOT NULL,
-                remind_at TEXT NOT NULL,     -- ISO datetime (UTC recommended)
-                type TEXT NOT NULL,          -- '2h' | '30m' | ...
-                status TEXT NOT NULL DEFAULT 'pending',  -- 'pending' | 'sent' | 'canceled' | 'failed'
-                attempts INTEGER NOT NULL DEFAULT 0,
-                last_error TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (booking_id) REFERENCES bookings(id)
+            await db.executemany(
+                """
+                INSERT INTO weekly_schedule (weekday, is_working, work_start, work_end)
+                VALUES (?, ?, '09:00', '19:00')
+                """,
+                [(wd, 0 if wd == 6 else 1) for wd in range(7)],
             )
-            """
-        )
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_reminders_status_time ON reminders(status, remind_at)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_reminders_booking ON reminders(booking_id)")
 
-        await db.commit()
+        # статистика для планувальника, щоб він обирав складені індекси
+        await db.execute("ANALYZE")
+        await db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
 
 # =======================
 #  USERS
 # =======================
 
+class User(NamedTuple):
+    id: int
+    full_name: Optional[str]
+    phone: Optional[str]
+    is_admin: bool
+    ui_message_id: Optional[int]
+
+
+# tg_id -> останнє записане full_name (None = рядок є, ім'я не передавали)
+_known_user_names: Dict[int, Optional[str]] = {}
+_KNOWN_USER_NAMES_MAX = 10_000
+
+
 async def upsert_user(tg_id: int, full_name: str | None = None) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    # викликається на кожен /start: без змін не пишемо в БД взагалі
+    if tg_id in _known_user_names and (full_name is None or _known_user_names[tg_id] == full_name):
+        return
+
+    async with _writer() as db:
+        # WHERE: якщо ім'я не змінилось, SQLite не чіпає сторінку (no-op update)
         await db.execute(
             """
             INSERT INTO users (id, full_name)
             VALUES (?, ?)
             ON CONFLICT(id) DO UPDATE SET
-                full_name = COALESCE(?, full_name)
+                full_name = excluded.full_name
+            WHERE excluded.full_name IS NOT NULL
+              AND users.full_name IS NOT excluded.full_name
             """,
-            (tg_id, full_name, full_name),
+            (tg_id, full_name),
         )
         await db.commit()
 
+    if tg_id not in _known_user_names:
+        _admin_cache.pop(("get_all_client_tg_ids",), None)
+        # лише пропуск зайвих записів: після очищення перший /start знову піде в БД (no-op)
+        if len(_known_user_names) >= _KNOWN_USER_NAMES_MAX:
+            _known_user_names.clear()
+    if full_name is not None:
+        _known_user_names[tg_id] = full_name
+    else:
+        _known_user_names.setdefault(tg_id, None)
+
 
 async def update_user_phone(tg_id: int, phone: str) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute(
             """
             UPDATE users
@@ -266,7 +512,7 @@ async def update_user_phone(tg_id: int, phone: str) -> None:
 
 
 async def set_user_ui_message_id(tg_id: int, message_id: int | None) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute(
             """
             UPDATE users
@@ -278,24 +524,24 @@ async def set_user_ui_message_id(tg_id: int, message_id: int | None) -> None:
         await db.commit()
 
 
-async def get_user(tg_id: int) -> Optional[Dict[str, Any]]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT id, full_name, phone, is_admin, ui_message_id FROM users WHERE id = ?",
-            (tg_id,),
-        )
-        row = await cursor.fetchone()
+async def get_user(tg_id: int) -> Optional[User]:
+    db = await get_db()
+    cursor = await db.execute(
+        "SELECT id, full_name, phone, is_admin, ui_message_id FROM users WHERE id = ?",
+        (tg_id,),
+    )
+    row = await cursor.fetchone()
 
     if not row:
         return None
 
-    return {
-        "id": int(row[0]),
-        "full_name": row[1],
-        "phone": row[2],
-        "is_admin": bool(row[3]),
-        "ui_message_id": (int(row[4]) if row[4] is not None else None),
-    }
+    return User(
+        int(row[0]),
+        row[1],
+        row[2],
+        bool(row[3]),
+        (int(row[4]) if row[4] is not None else None),
+    )
 
 
 # =======================
@@ -303,68 +549,73 @@ async def get_user(tg_id: int) -> Optional[Dict[str, Any]]:
 # =======================
 
 async def get_shop_settings() -> Dict[str, Any]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT
-                base_grid_minutes,
-                short_service_threshold_minutes,
-                rest_minutes_after_short,
-                extra_round_minutes,
-                min_lead_minutes,
-                default_work_start,
-                default_work_end
-            FROM shop_settings
-            WHERE id = 1
-            """
-        )
-        row = await cur.fetchone()
+    global _settings_cache
+    if _settings_cache is not None:
+        return dict(_settings_cache)
+
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT
+            base_grid_minutes,
+            short_service_threshold_minutes,
+            rest_minutes_after_short,
+            extra_round_minutes,
+            min_lead_minutes,
+            default_work_start,
+            default_work_end
+        FROM shop_settings
+        WHERE id = 1
+        """
+    )
+    row = await cur.fetchone()
 
-    return {
-        "base_grid_minutes": int(row[0]),
-        "short_service_threshold_minutes": int(row[1]),
-        "rest_minutes_after_short": int(row[2]),
-        "extra_round_minutes": int(row[3]),
-        "min_lead_minutes": int(row[4]),
-        "default_work_start": row[5],
-        "default_work_end": row[6],
-    }
+    # назви колонок = ключі; INTEGER NOT NULL вже приходять як int
+    out = dict(row)
+    if gen == _cache_gen:
+        _settings_cache = out
+    return dict(out)
 
 
 async def set_base_grid_minutes(minutes: int) -> None:
     minutes = int(minutes)
     if minutes not in (30, 60, 90, 120):
         raise ValueError("base_grid_minutes must be one of: 30, 60, 90, 120")
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("UPDATE shop_settings SET base_grid_minutes = ? WHERE id = 1", (minutes,))
         await db.commit()
+        _invalidate_settings_cache()
 
 
 async def set_short_service_threshold_minutes(minutes: int) -> None:
     minutes = int(minutes)
     if minutes < 5 or minutes > 120:
         raise ValueError("short_service_threshold_minutes must be between 5 and 120")
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("UPDATE shop_settings SET short_service_threshold_minutes = ? WHERE id = 1", (minutes,))
         await db.commit()
+        _invalidate_settings_cache()
 
 
 async def set_rest_minutes_after_short(minutes: int) -> None:
     minutes = int(minutes)
     if minutes < 0 or minutes > 60:
         raise ValueError("rest_minutes_after_short must be between 0 and 60")
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("UPDATE shop_settings SET rest_minutes_after_short = ? WHERE id = 1", (minutes,))
         await db.commit()
+        _invalidate_settings_cache()
 
 
 async def set_extra_round_minutes(minutes: int) -> None:
     minutes = int(minutes)
     if minutes not in (5, 10, 15, 20, 30):
         raise ValueError("extra_round_minutes must be one of: 5, 10, 15, 20, 30")
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("UPDATE shop_settings SET extra_round_minutes = ? WHERE id = 1", (minutes,))
         await db.commit()
+        _invalidate_settings_cache()
 
 
 # Backward-compat: if somewhere in code you still call set_slot_step_minutes,
@@ -377,9 +628,10 @@ async def set_min_lead_minutes(minutes: int) -> None:
     minutes = int(minutes)
     if minutes < 0 or minutes > 24 * 60:
         raise ValueError("min_lead_minutes must be between 0 and 1440")
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("UPDATE shop_settings SET min_lead_minutes = ? WHERE id = 1", (minutes,))
         await db.commit()
+        _invalidate_settings_cache()
 
 
 async def set_shop_setting(key: str, value: int) -> None:
@@ -408,38 +660,41 @@ async def get_weekly_schedule() -> Dict[int, Dict[str, Any]]:
     """
     {weekday: {"is_working": bool, "work_start": "HH:MM", "work_end": "HH:MM"}}
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT weekday, is_working, work_start, work_end
-            FROM weekly_schedule
-            ORDER BY weekday
-            """
-        )
-        rows = await cur.fetchall()
+    global _schedule_cache
+    if _schedule_cache is not None:
+        return {wd: dict(v) for wd, v in _schedule_cache.items()}
+
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT weekday, is_working, work_start, work_end
+        FROM weekly_schedule
+        ORDER BY weekday
+        """
+    )
+    rows = await cur.fetchall()
 
-    out: Dict[int, Dict[str, Any]] = {}
-    for wd, is_working, ws, we in rows:
-        out[int(wd)] = {"is_working": bool(is_working), "work_start": ws, "work_end": we}
-    return out
+    out: Dict[int, Dict[str, Any]] = {
+        r["weekday"]: {"is_working": bool(r["is_working"]), "work_start": r["work_start"], "work_end": r["work_end"]}
+        for r in rows
+    }
+    if gen == _cache_gen:
+        _schedule_cache = out
+    return {wd: dict(v) for wd, v in out.items()}
 
 
 async def get_day_schedule(weekday: int) -> Optional[Dict[str, Any]]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT weekday, is_working, work_start, work_end
-            FROM weekly_schedule
-            WHERE weekday = ?
-            """,
-            (int(weekday),),
-        )
-        row = await cur.fetchone()
+    weekday = int(weekday)
+    schedule = _schedule_cache
+    if schedule is None:
+        schedule = await get_weekly_schedule()
 
-    if not row:
+    day = schedule.get(weekday)
+    if day is None:
         return None
 
-    return {"weekday": int(row[0]), "is_working": bool(row[1]), "work_start": row[2], "work_end": row[3]}
+    return {"weekday": weekday, **day}
 
 
 async def set_day_schedule(
@@ -468,7 +723,7 @@ async def set_day_schedule(
 
     values.append(weekday)
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute(
             f"""
             UPDATE weekly_schedule
@@ -478,6 +733,7 @@ async def set_day_schedule(
             tuple(values),
         )
         await db.commit()
+        _invalidate_schedule_cache()
 
 
 async def get_breaks_for_weekday(weekday: int) -> List[Dict[str, Any]]:
@@ -485,33 +741,35 @@ async def get_breaks_for_weekday(weekday: int) -> List[Dict[str, Any]]:
     Повертає перерви:
       - weekday == конкретний
       - weekday IS NULL (для всіх днів)
+    Повертаються копії рядків: кешовані dict-и назовні не змінюються.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT id, weekday, start_time, end_time, is_enabled
-            FROM schedule_breaks
-            WHERE is_enabled = 1 AND (weekday = ? OR weekday IS NULL)
-            ORDER BY COALESCE(weekday, -1), start_time
-            """,
-            (int(weekday),),
-        )
-        rows = await cur.fetchall()
-
-    return [
-        {
-            "id": int(r[0]),
-            "weekday": (int(r[1]) if r[1] is not None else None),
-            "start_time": r[2],
-            "end_time": r[3],
-            "is_enabled": bool(r[4]),
-        }
-        for r in rows
-    ]
+    weekday = int(weekday)
+    cached = _breaks_cache.get(weekday)
+    if cached is not None:
+        return [dict(r) for r in cached]
+
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT id, weekday, start_time, end_time, is_enabled
+        FROM schedule_breaks
+        WHERE is_enabled = 1 AND (weekday = ? OR weekday IS NULL)
+        ORDER BY COALESCE(weekday, -1), start_time
+        """,
+        (weekday,),
+    )
+    rows = await cur.fetchall()
+
+    # dict лише на межі API (викликачі використовують .get); колонки INTEGER вже int
+    out = [{**dict(r), "is_enabled": bool(r["is_enabled"])} for r in rows]
+    if gen == _cache_gen:
+        _breaks_cache[weekday] = out
+    return [dict(r) for r in out]
 
 
 async def add_break(weekday: Optional[int], start_time: str, end_time: str) -> int:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         cur = await db.execute(
             """
             INSERT INTO schedule_breaks (weekday, start_time, end_time, is_enabled)
@@ -520,22 +778,25 @@ async def add_break(weekday: Optional[int], start_time: str, end_time: str) -> i
             (int(weekday) if weekday is not None else None, start_time, end_time),
         )
         await db.commit()
+        _invalidate_breaks_cache()
         return int(cur.lastrowid)
 
 
 async def remove_break(break_id: int) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("DELETE FROM schedule_breaks WHERE id = ?", (int(break_id),))
         await db.commit()
+        _invalidate_breaks_cache()
 
 
 async def set_break_enabled(break_id: int, is_enabled: bool) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute(
             "UPDATE schedule_breaks SET is_enabled = ? WHERE id = ?",
             (1 if is_enabled else 0, int(break_id)),
         )
         await db.commit()
+        _invalidate_breaks_cache()
 
 
 # =======================
@@ -543,22 +804,54 @@ async def set_break_enabled(break_id: int, is_enabled: bool) -> None:
 # =======================
 
 async def add_day_off(date_str: str) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("INSERT OR IGNORE INTO days_off(date) VALUES (?)", (date_str,))
         await db.commit()
+        _bump_days_off_cache(date_str, off=True)
 
 
 async def remove_day_off(date_str: str) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute("DELETE FROM days_off WHERE date = ?", (date_str,))
         await db.commit()
+        _bump_days_off_cache(date_str, off=False)
 
 
 async def is_day_off(date_str: str) -> bool:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute("SELECT 1 FROM days_off WHERE date = ? LIMIT 1", (date_str,))
-        row = await cur.fetchone()
-        return row is not None
+    global _days_off_cache
+    days_off = _days_off_cache
+    if days_off is None:
+        gen = _cache_gen
+        db = await get_db()
+        cur = await db.execute("SELECT date FROM days_off")
+        days_off = {r[0] for r in await cur.fetchall()}
+        if gen == _cache_gen:
+            _days_off_cache = days_off
+    return date_str in days_off
+
+
+async def get_working_dates(dates: Sequence[date]) -> List[date]:
+    """
+    Робочі дати з переданих (не у days_off і weekly_schedule.is_working; дня нема в графіку -> робочий).
+    Одне прогрівання кешів на весь список замість is_day_off + get_day_schedule на кожну дату.
+    """
+    if _days_off_cache is None or _schedule_cache is None:
+        await _warm_work_caches()
+    days_off = _days_off_cache
+    schedule = _schedule_cache
+    if days_off is None or schedule is None:
+        # кеш скинуто записом під час прогріву: читаємо напряму
+        schedule = await get_weekly_schedule()
+        days_off = {d.isoformat() for d in dates if await is_day_off(d.isoformat())}
+
+    out: List[date] = []
+    for d in dates:
+        if d.isoformat() in days_off:
+            continue
+        day = schedule.get(d.weekday())
+        if day is None or day["is_working"]:
+            out.append(d)
+    return out
 
 
 async def get_work_context_for_date(date_str: str) -> Dict[str, Any]:
@@ -567,19 +860,91 @@ async def get_work_context_for_date(date_str: str) -> Dict[str, Any]:
     - враховує days_off
     - weekly_schedule
     - breaks
+
+    Окрім рядків "HH:MM" повертає вже пораховані хвилини:
+    work_start_min / work_end_min і break_intervals [(start_min, end_min), ...].
     """
     dt = datetime.fromisoformat(date_str).date()
     wd = dt.weekday()
 
+    if _days_off_cache is None or _schedule_cache is None or wd not in _breaks_cache:
+        await _warm_work_caches()
+
     if await is_day_off(date_str):
-        return {"is_working": False, "work_start": None, "work_end": None, "breaks": []}
+        return _closed_day_context()
 
     day = await get_day_schedule(wd)
     if not day or not day["is_working"]:
-        return {"is_working": False, "work_start": None, "work_end": None, "breaks": []}
+        return _closed_day_context()
 
     breaks = await get_breaks_for_weekday(wd)
-    return {"is_working": True, "work_start": day["work_start"], "work_end": day["work_end"], "breaks": breaks}
+    return {
+        "is_working": True,
+        "work_start": day["work_start"],
+        "work_end": day["work_end"],
+        "breaks": breaks,
+        "work_start_min": _to_minutes(day["work_start"]),
+        "work_end_min": _to_minutes(day["work_end"]),
+        "break_intervals": [(_to_minutes(b["start_time"]), _to_minutes(b["end_time"])) for b in breaks],
+    }
+
+
+async def _warm_work_caches() -> None:
+    """
+    Один запит (UNION ALL) замість трьох: заповнює кеші вихідних, графіка
+    і перерв одразу для всіх днів тижня.
+    """
+    global _days_off_cache, _schedule_cache
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT 'off' AS kind, date AS a, NULL AS b, NULL AS c, NULL AS d
+        FROM days_off
+        UNION ALL
+        SELECT 'day', weekday, is_working, work_start, work_end
+        FROM weekly_schedule
+        UNION ALL
+        SELECT 'break', id, weekday, start_time, end_time
+        FROM schedule_breaks
+        WHERE is_enabled = 1
+        """
+    )
+    rows = await cur.fetchall()
+    if gen != _cache_gen:
+        return
+
+    days_off: set[str] = set()
+    schedule: Dict[int, Dict[str, Any]] = {}
+    breaks: List[Dict[str, Any]] = []
+    for kind, a, b, c, d in rows:
+        if kind == "off":
+            days_off.add(a)
+        elif kind == "day":
+            schedule[a] = {"is_working": bool(b), "work_start": c, "work_end": d}
+        else:
+            breaks.append({"id": a, "weekday": b, "start_time": c, "end_time": d, "is_enabled": True})
+
+    # той самий порядок, що й у get_breaks_for_weekday: ORDER BY COALESCE(weekday, -1), start_time
+    breaks.sort(key=lambda br: (br["weekday"] if br["weekday"] is not None else -1, br["start_time"]))
+
+    _days_off_cache = days_off
+    _schedule_cache = schedule
+    _breaks_cache.clear()
+    for wd in range(7):
+        _breaks_cache[wd] = [br for br in breaks if br["weekday"] is None or br["weekday"] == wd]
+
+
+def _closed_day_context() -> Dict[str, Any]:
+    return {
+        "is_working": False,
+        "work_start": None,
+        "work_end": None,
+        "breaks": [],
+        "work_start_min": None,
+        "work_end_min": None,
+        "break_intervals": [],
+    }
 
 
 # =======================
@@ -603,14 +968,13 @@ async def create_booking(
     НЕ атомарно. Залишено для сумісності.
     Для “без гонок” використовуй create_booking_atomic().
     """
-    now = _iso_utc_now()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         cursor = await db.execute(
-            """
+            f"""
             INSERT INTO bookings
             (client_id, date, time, duration_minutes, occupy_minutes, service_code, service_text, price_text,
              client_name, phone, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {_SQL_UTC_NOW}, {_SQL_UTC_NOW})
             """,
             (
                 client_id,
@@ -624,11 +988,10 @@ async def create_booking(
                 client_name,
                 phone,
                 status,
-                now,
-                now,
             ),
         )
         await db.commit()
+        _invalidate_day_bookings_cache(date_str)
         return int(cursor.lastrowid)
 
 
@@ -645,99 +1008,125 @@ async def create_booking_atomic(
     *,
     status: str = "pending",
     occupy_minutes: Optional[int] = None,
+    reminders: Sequence[Tuple[str, int, str, str]] = (),
 ) -> int:
     """
     Атомарне створення броні в SQLite:
     - BEGIN IMMEDIATE
     - перевірка перетинів по активних бронях (pending/approved), з урахуванням occupy_minutes існуючих записів
-    - вставка
+      (одним SELECT ... LIMIT 1 по start_min/end_min, без вичитування рядків у Python)
+    - вставка (+ нагадування тією ж транзакцією, один commit/fsync)
+
+    reminders:
+      (target, tg_id, remind_at_iso, reminder_type) — як аргументи add_reminder(), booking_id підставляється.
 
     occupy_minutes:
       якщо передано, для конфлікту беремо саме його (duration + rest, наприклад).
       якщо None — беремо duration_minutes.
     """
-    now = _iso_utc_now()
     new_start = _to_minutes(time_str)
     occ_new = int(occupy_minutes) if occupy_minutes is not None else int(duration_minutes)
     new_end = new_start + occ_new
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
-        await db.execute("BEGIN IMMEDIATE")
+    # швидка відмова з кешу, без write-lock; остаточна перевірка — у транзакції нижче
+    if _cached_overlap(date_str, new_start, new_end):
+        raise ValueError("TIME_SLOT_ALREADY_TAKEN")
+
+    async with _writer() as db:
+        # finally, а не після commit: читання на спільному з'єднанні не під lock-ом і можуть
+        # закешувати ще не закомічений INSERT; після ROLLBACK такий рядок лишився б у кеші
+        try:
+            async with _immediate_tx(db):
+                # [new_start, new_end) overlaps [start_min, end_min)
+                cur = await db.execute(
+                    """
+                    SELECT 1
+                    FROM bookings
+                    WHERE date = ?
+                      AND status IN ('pending','approved')
+                      AND start_min < ?
+                      AND end_min > ?
+                    LIMIT 1
+                    """,
+                    (date_str, new_end, new_start),
+                )
+                if await cur.fetchone() is not None:
+                    raise ValueError("TIME_SLOT_ALREADY_TAKEN")
+
+                cursor = await db.execute(
+                    f"""
+                    INSERT INTO bookings
+                    (client_id, date, time, duration_minutes, occupy_minutes, service_code, service_text, price_text,
+                     client_name, phone, status, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {_SQL_UTC_NOW}, {_SQL_UTC_NOW})
+                    """,
+                    (
+                        client_id,
+                        date_str,
+                        time_str,
+                        int(duration_minutes),
+                        (int(occupy_minutes) if occupy_minutes is not None else None),
+                        service_code,
+                        service_text,
+                        price_text,
+                        client_name,
+                        phone,
+                        status,
+                    ),
+                )
+                booking_id = int(cursor.lastrowid)
 
-        cur = await db.execute(
-            """
-            SELECT time, duration_minutes, occupy_minutes
-            FROM bookings
-            WHERE date = ?
-              AND status IN ('pending','approved')
-            """,
-            (date_str,),
-        )
-        rows = await cur.fetchall()
-
-        for t, dur, occ_db in rows:
-            s = _to_minutes(t)
-            occ_existing = int(occ_db) if occ_db is not None else int(dur)
-            e = s + occ_existing
-            if _intervals_overlap(new_start, new_end, s, e):
-                await db.execute("ROLLBACK")
-                raise ValueError("TIME_SLOT_ALREADY_TAKEN")
-
-        cursor = await db.execute(
-            """
-            INSERT INTO bookings
-            (client_id, date, time, duration_minutes, occupy_minutes, service_code, service_text, price_text,
-             client_name, phone, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                client_id,
-                date_str,
-                time_str,
-                int(duration_minutes),
-                (int(occupy_minutes) if occupy_minutes is not None else None),
-                service_code,
-                service_text,
-                price_text,
-                client_name,
-                phone,
-                status,
-                now,
-                now,
-            ),
-        )
-        await db.commit()
-        return int(cursor.lastrowid)
+                if reminders:
+                    await db.executemany(
+                        _INSERT_REMINDER_SQL,
+                        [
+                            (booking_id, target, int(tg_id), remind_at_iso, reminder_type)
+                            for target, tg_id, remind_at_iso, reminder_type in reminders
+                        ],
+                    )
+        finally:
+            _invalidate_day_bookings_cache(date_str)
+        return booking_id
 
 
 async def get_active_bookings_for_date(target_date: date) -> List[Dict[str, Any]]:
     """
-    Активні записи (pending/approved) на дату.
-    Використовується для генерації слотів / перевірки перетинів.
+    Активні записи (pending/approved) на дату, за часом.
+    Використовується для генерації слотів / перевірки перетинів. Повертаються копії рядків.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            SELECT id, time, duration_minutes, occupy_minutes, status
-            FROM bookings
-            WHERE date = ?
-              AND status IN ('pending', 'approved')
-            """,
-            (target_date.isoformat(),),
-        )
-        rows = await cursor.fetchall()
-
-    return [
-        {
-            "id": int(r[0]),
-            "time": r[1],
-            "duration_minutes": int(r[2]),
-            "occupy_minutes": (int(r[3]) if r[3] is not None else None),
-            "status": r[4],
-        }
+    date_str = target_date.isoformat()
+    cached = _day_bookings_cache.get(date_str)
+    if cached is not None:
+        return [dict(r) for r in cached.rows]
+
+    gen = _cache_gen
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT id, time, duration_minutes, occupy_minutes, status, start_min, end_min
+        FROM bookings
+        WHERE date = ?
+          AND status IN ('pending', 'approved')
+        ORDER BY start_min
+        """,
+        (date_str,),
+    )
+    rows = await cursor.fetchall()
+
+    out = [
+        {"id": r[0], "time": r[1], "duration_minutes": r[2], "occupy_minutes": r[3], "status": r[4]}
         for r in rows
     ]
+    if gen == _cache_gen:
+        max_ends: List[int] = []
+        top = 0
+        for r in rows:
+            top = max(top, r[6])
+            max_ends.append(top)
+        if len(_day_bookings_cache) >= _DAY_BOOKINGS_CACHE_MAX:
+            _day_bookings_cache.clear()
+        _day_bookings_cache[date_str] = _DayBookings(out, [r[5] for r in rows], max_ends)
+    return [dict(r) for r in out]
 
 
 async def count_client_active_requests_for_day(client_id: int, day_str: str) -> int:
@@ -745,172 +1134,132 @@ async def count_client_active_requests_for_day(client_id: int, day_str: str) ->
     М'який ліміт: рахуємо активні заявки (pending/approved) за день створення.
     day_str: 'YYYY-MM-DD'
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            SELECT COUNT(*)
-            FROM bookings
-            WHERE client_id = ?
-              AND substr(created_at, 1, 10) = ?
-              AND status IN ('pending', 'approved')
-            """,
-            (client_id, day_str),
-        )
-        row = await cursor.fetchone()
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT COUNT(*)
+        FROM bookings
+        WHERE client_id = ?
+          AND created_date = ?
+          AND status IN ('pending', 'approved')
+        """,
+        (client_id, day_str),
+    )
+    row = await cursor.fetchone()
 
     return int(row[0] or 0)
 
 
 async def get_bookings_for_date(target_date: date) -> List[Dict[str, Any]]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            SELECT id, date, time, duration_minutes, occupy_minutes, client_name, phone, service_text, price_text, status
-            FROM bookings
-            WHERE date = ?
-            ORDER BY time
-            """,
-            (target_date.isoformat(),),
-        )
-        rows = await cursor.fetchall()
-
-    return [
-        {
-            "id": int(r[0]),
-            "date": r[1],
-            "time": r[2],
-            "duration_minutes": int(r[3]),
-            "occupy_minutes": (int(r[4]) if r[4] is not None else None),
-            "client_name": r[5],
-            "phone": r[6],
-            "service_text": r[7],
-            "price_text": r[8],
-            "status": r[9],
-        }
-        for r in rows
-    ]
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT id, date, time, duration_minutes, occupy_minutes, client_name, phone, service_text, price_text, status
+        FROM bookings
+        WHERE date = ?
+        ORDER BY time
+        """,
+        (target_date.isoformat(),),
+    )
+    rows = await cursor.fetchall()
+
+    return [dict(r) for r in rows]
 
 
 async def get_booking_by_id(booking_id: int) -> Optional[Dict[str, Any]]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            SELECT id, client_id, date, time, duration_minutes, occupy_minutes, service_code, service_text, price_text,
-                   client_name, phone, status
-            FROM bookings
-            WHERE id = ?
-            """,
-            (int(booking_id),),
-        )
-        row = await cursor.fetchone()
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT id, client_id, date, time, duration_minutes, occupy_minutes, service_code, service_text, price_text,
+               client_name, phone, status
+        FROM bookings
+        WHERE id = ?
+        """,
+        (int(booking_id),),
+    )
+    row = await cursor.fetchone()
 
     if not row:
         return None
 
-    return {
-        "id": int(row[0]),
-        "client_id": int(row[1]),
-        "date": row[2],
-        "time": row[3],
-        "duration_minutes": int(row[4]),
-        "occupy_minutes": (int(row[5]) if row[5] is not None else None),
-        "service_code": row[6],
-        "service_text": row[7],
-        "price_text": row[8],
-        "client_name": row[9],
-        "phone": row[10],
-        "status": row[11],
-    }
+    return dict(row)
 
 
 async def update_booking_status(booking_id: int, status: str) -> None:
-    now = _iso_utc_now()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         await db.execute(
-            """
+            f"""
             UPDATE bookings
-            SET status = ?, updated_at = ?
+            SET status = ?, updated_at = {_SQL_UTC_NOW}
             WHERE id = ?
             """,
-            (status, now, int(booking_id)),
+            (status, int(booking_id)),
         )
         await db.commit()
+        _invalidate_day_bookings_cache()
 
 
 async def get_pending_bookings() -> List[Dict[str, Any]]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            SELECT id, date, time, duration_minutes, occupy_minutes, client_name, phone, service_text, price_text
-            FROM bookings
-            WHERE status = 'pending'
-            ORDER BY date, time
-            """
-        )
-        rows = await cursor.fetchall()
-
-    return [
-        {
-            "id": int(r[0]),
-            "date": r[1],
-            "time": r[2],
-            "duration_minutes": int(r[3]),
-            "occupy_minutes": (int(r[4]) if r[4] is not None else None),
-            "client_name": r[5],
-            "phone": r[6],
-            "service_text": r[7],
-            "price_text": r[8],
-        }
-        for r in rows
-    ]
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT id, date, time, duration_minutes, occupy_minutes, client_name, phone, service_text, price_text
+        FROM bookings
+        WHERE status = 'pending'
+        ORDER BY date, time
+        """
+    )
+    return [dict(r) async for r in _iter_rows(cursor)]
 
 
 async def get_client_bookings(client_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            SELECT id, date, time, duration_minutes, occupy_minutes, service_text, price_text, status
-            FROM bookings
-            WHERE client_id = ?
-            ORDER BY date DESC, time DESC
-            LIMIT ?
-            """,
-            (int(client_id), int(limit)),
-        )
-        rows = await cursor.fetchall()
-
-    return [
-        {
-            "id": int(r[0]),
-            "date": r[1],
-            "time": r[2],
-            "duration_minutes": int(r[3]),
-            "occupy_minutes": (int(r[4]) if r[4] is not None else None),
-            "service_text": r[5],
-            "price_text": r[6],
-            "status": r[7],
-        }
-        for r in rows
-    ]
+    """
+    Останні броні клієнта. Кеш без TTL: будь-який запис броні скидає його
+    через _invalidate_day_bookings_cache. Повертаються копії рядків.
+    """
+    key = (int(client_id), int(limit))
+    cached = _client_bookings_cache.get(key)
+    if cached is not None:
+        return [dict(r) for r in cached]
+
+    gen = _cache_gen
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        SELECT id, date, time, duration_minutes, occupy_minutes, service_text, price_text, status
+        FROM bookings
+        WHERE client_id = ?
+        ORDER BY date DESC, time DESC
+        LIMIT ?
+        """,
+        key,
+    )
+    out = [dict(r) for r in await cursor.fetchall()]
+    if gen == _cache_gen:
+        if len(_client_bookings_cache) >= _CLIENT_BOOKINGS_CACHE_MAX:
+            _client_bookings_cache.clear()
+        _client_bookings_cache[key] = out
+    return [dict(r) for r in out]
 
 
 async def cancel_booking_by_client(booking_id: int, client_id: int) -> bool:
     """
     Клієнт може скасувати тільки активний запис: pending або approved.
     """
-    now = _iso_utc_now()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         cursor = await db.execute(
-            """
+            f"""
             UPDATE bookings
-            SET status = 'cancelled_by_client', updated_at = ?
+            SET status = 'cancelled_by_client', updated_at = {_SQL_UTC_NOW}
             WHERE id = ?
               AND client_id = ?
               AND status IN ('pending','approved')
             """,
-            (now, int(booking_id), int(client_id)),
+            (int(booking_id), int(client_id)),
         )
         await db.commit()
+        if cursor.rowcount > 0:
+            _invalidate_day_bookings_cache()
         return cursor.rowcount > 0
 
 
@@ -918,6 +1267,12 @@ async def cancel_booking_by_client(booking_id: int, client_id: int) -> bool:
 #  REMINDERS (DB LAYER)
 # =======================
 
+_INSERT_REMINDER_SQL = f"""
+    INSERT INTO reminders (booking_id, target, tg_id, remind_at, type, status, attempts, last_error, created_at)
+    VALUES (?, ?, ?, ?, ?, 'pending', 0, NULL, {_SQL_UTC_NOW})
+"""
+
+
 async def add_reminder(
     *,
     booking_id: int | None,
@@ -926,21 +1281,17 @@ async def add_reminder(
     remind_at_iso: str,
     reminder_type: str,
 ) -> int:
-    now = _iso_utc_now()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         cur = await db.execute(
-            """
-            INSERT INTO reminders (booking_id, target, tg_id, remind_at, type, status, attempts, last_error, created_at)
-            VALUES (?, ?, ?, ?, ?, 'pending', 0, NULL, ?)
-            """,
-            (int(booking_id) if booking_id is not None else None, target, int(tg_id), remind_at_iso, reminder_type, now),
+            _INSERT_REMINDER_SQL,
+            (int(booking_id) if booking_id is not None else None, target, int(tg_id), remind_at_iso, reminder_type),
         )
         await db.commit()
         return int(cur.lastrowid)
 
 
 async def cancel_pending_reminders_for_booking(booking_id: int) -> int:
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _writer() as db:
         cur = await db.execute(
             """
             UPDATE reminders
@@ -959,53 +1310,59 @@ async def get_due_reminders(now_iso: str, limit: int = 50) -> List[Dict[str, Any
     Забирає reminders, які треба відправити (pending + remind_at <= now).
     now_iso: ISO UTC timestamp
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT id, booking_id, target, tg_id, remind_at, type, attempts
-            FROM reminders
-            WHERE status = 'pending'
-              AND remind_at <= ?
-            ORDER BY remind_at ASC
-            LIMIT ?
-            """,
-            (now_iso, int(limit)),
-        )
-        rows = await cur.fetchall()
-
-    return [
-        {
-            "id": int(r[0]),
-            "booking_id": (int(r[1]) if r[1] is not None else None),
-            "target": r[2],
-            "tg_id": int(r[3]),
-            "remind_at": r[4],
-            "type": r[5],
-            "attempts": int(r[6] or 0),
-        }
-        for r in rows
-    ]
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT id, booking_id, target, tg_id, remind_at, type, attempts
+        FROM reminders
+        WHERE status = 'pending'
+          AND remind_at <= ?
+        ORDER BY remind_at ASC
+        LIMIT ?
+        """,
+        (now_iso, int(limit)),
+    )
+    rows = await cur.fetchall()
+
+    return [dict(r) for r in rows]
 
 
 async def mark_reminder_sent(reminder_id: int) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("UPDATE reminders SET status = 'sent' WHERE id = ?", (int(reminder_id),))
-        await db.commit()
+    await mark_reminders_sent([reminder_id])
 
 
 async def mark_reminder_failed(reminder_id: int, error_text: str) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """
-            UPDATE reminders
-            SET status = 'failed',
-                attempts = attempts + 1,
-                last_error = ?
-            WHERE id = ?
-            """,
-            (error_text[:500], int(reminder_id)),
-        )
-        await db.commit()
+    await mark_reminders_failed([(reminder_id, error_text)])
+
+
+async def mark_reminders_sent(reminder_ids: List[int]) -> None:
+    """Пакетно для одного тіку розсилки: одна транзакція (один fsync) на всі id."""
+    if not reminder_ids:
+        return
+    async with _writer() as db:
+        async with _immediate_tx(db):
+            await db.executemany(
+                "UPDATE reminders SET status = 'sent' WHERE id = ?",
+                [(int(rid),) for rid in reminder_ids],
+            )
+
+
+async def mark_reminders_failed(items: List[Tuple[int, str]]) -> None:
+    """items: (reminder_id, error_text); аналогічно mark_reminders_sent."""
+    if not items:
+        return
+    async with _writer() as db:
+        async with _immediate_tx(db):
+            await db.executemany(
+                """
+                UPDATE reminders
+                SET status = 'failed',
+                    attempts = attempts + 1,
+                    last_error = ?
+                WHERE id = ?
+                """,
+                [(error_text[:500], int(rid)) for rid, error_text in items],
+            )
 
 
 # =======================
@@ -1023,47 +1380,27 @@ async def get_report_for_period(start_date: date, end_date: date) -> Dict[str, A
     start_str = start_date.isoformat()
     end_str = end_date.isoformat()
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            """
-            SELECT COUNT(*)
+    # один прохід по діапазону: агрегати по днях, з них — усі чотири значення
+    db = await get_db()
+    cursor = await db.execute(
+        """
+        WITH d AS (
+            SELECT date,
+                   COUNT(*) AS total,
+                   SUM(status IN ('approved','completed')) AS finished
             FROM bookings
-            WHERE date BETWEEN ? AND ?
-            """,
-            (start_str, end_str),
-        )
-        total_bookings = int((await cursor.fetchone())[0] or 0)
-
-        cursor = await db.execute(
-            """
-            SELECT COUNT(*)
-            FROM bookings
-            WHERE date BETWEEN ? AND ?
-              AND status IN ('approved','completed')
-            """,
-            (start_str, end_str),
-        )
-        finished_bookings = int((await cursor.fetchone())[0] or 0)
-
-        cursor = await db.execute(
-            """
-            SELECT date, COUNT(*) as cnt
-            FROM bookings
-            WHERE date BETWEEN ? AND ?
-              AND status IN ('approved','completed')
+            WHERE date BETWEEN :start AND :end
             GROUP BY date
-            ORDER BY cnt DESC
-            LIMIT 1
-            """,
-            (start_str, end_str),
         )
-        row = await cursor.fetchone()
-
-    busiest_day = None
-    busiest_day_count = 0
-    if row:
-        busiest_day = row[0]
-        busiest_day_count = int(row[1] or 0)
+        SELECT
+            (SELECT COALESCE(SUM(total), 0) FROM d),
+            (SELECT COALESCE(SUM(finished), 0) FROM d),
+            (SELECT date FROM d WHERE finished > 0 ORDER BY finished DESC LIMIT 1),
+            (SELECT COALESCE(MAX(finished), 0) FROM d)
+        """,
+        {"start": start_str, "end": end_str},
+    )
+    total_bookings, finished_bookings, busiest_day, busiest_day_count = await cursor.fetchone()
 
     return {
         "total_bookings": total_bookings,
@@ -1080,54 +1417,132 @@ async def get_report_for_period(start_date: date, end_date: date) -> Dict[str, A
 async def get_bookings_for_date_admin(date_str: str) -> List[Tuple[int, str, str, str, str]]:
     """
     (booking_id, time_str, service_text, client_name, status)
+    Кеш без TTL: кожен запис броні скидає дату через _invalidate_day_bookings_cache.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT id, time, service_text, client_name, status
-            FROM bookings
-            WHERE date = ?
-            ORDER BY time
-            """,
-            (date_str,),
-        )
-        rows = await cur.fetchall()
-    return [(int(r[0]), r[1], r[2], r[3], r[4]) for r in rows]
+    cached = _admin_day_cache.get(date_str)
+    if cached is not None:
+        return list(cached)
+
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT id, time, service_text, client_name, status
+        FROM bookings
+        WHERE date = ?
+        ORDER BY time
+        """,
+        (date_str,),
+    )
+    out = [tuple(r) for r in await cur.fetchall()]
+    if gen == _cache_gen:
+        if len(_admin_day_cache) >= _DAY_BOOKINGS_CACHE_MAX:
+            _admin_day_cache.clear()
+        _admin_day_cache[date_str] = out
+    return list(out)
 
 
 async def get_bookings_for_period_admin(start_date: str, end_date: str) -> List[Tuple[str, str, str, str, str]]:
     """
     (date_str, time_str, service_text, client_name, status)
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT date, time, service_text, client_name, status
-            FROM bookings
-            WHERE date BETWEEN ? AND ?
-            ORDER BY date, time
-            """,
-            (start_date, end_date),
-        )
-        rows = await cur.fetchall()
-    return [(r[0], r[1], r[2], r[3], r[4]) for r in rows]
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT date, time, service_text, client_name, status
+        FROM bookings
+        WHERE date BETWEEN ? AND ?
+        ORDER BY date, time
+        """,
+        (start_date, end_date),
+    )
+    return [tuple(r) async for r in _iter_rows(cur)]
 
 
 async def get_pending_bookings_admin() -> List[Tuple[int, str, str, str, str]]:
     """
     (bid, date_str, time_str, service_text, client_name)
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT id, date, time, service_text, client_name
-            FROM bookings
-            WHERE status = 'pending'
-            ORDER BY date, time
-            """
-        )
-        rows = await cur.fetchall()
-    return [(int(r[0]), r[1], r[2], r[3], r[4]) for r in rows]
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT id, date, time, service_text, client_name
+        FROM bookings
+        WHERE status = 'pending'
+        ORDER BY date, time
+        """
+    )
+    rows = await cur.fetchall()
+    return [tuple(r) for r in rows]
+
+
+async def approve_booking_atomic(booking_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Підтвердження броні однією транзакцією (BEGIN IMMEDIATE):
+    читання броні -> перевірка статусу -> перевірка перетину по start_min/end_min -> UPDATE.
+
+    None — броні нема. Інакше dict з полями броні (date, time, service_text, price_text,
+    duration_minutes, client_tg_id, client_name) і outcome:
+      'approved' — підтверджено
+      'conflict' — час перетинається з іншою активною бронню, бронь відхилено (rejected)
+      'already'  — уже approved/completed
+      'inactive' — rejected/cancelled_*
+    """
+    async with _writer() as db:
+        # finally: див. create_booking_atomic (незакомічений UPDATE міг потрапити в кеш читачів)
+        try:
+            async with _immediate_tx(db):
+                cur = await db.execute(
+                    """
+                    SELECT
+                        b.date, b.time, b.status, b.service_text, b.price_text, b.duration_minutes,
+                        b.start_min, b.end_min, u.id AS client_tg_id, u.full_name AS client_name
+                    FROM bookings b
+                    LEFT JOIN users u ON u.id = b.client_id
+                    WHERE b.id = ?
+                    """,
+                    (int(booking_id),),
+                )
+                row = await cur.fetchone()
+                if row is None:
+                    return None
+
+                out = {
+                    "date": row["date"],
+                    "time": row["time"],
+                    "service_text": row["service_text"],
+                    "price_text": row["price_text"],
+                    "duration_minutes": int(row["duration_minutes"]),
+                    "client_tg_id": int(row["client_tg_id"]) if row["client_tg_id"] is not None else 0,
+                    "client_name": row["client_name"] if row["client_name"] is not None else "",
+                }
+                status = row["status"]
+                if status in ("approved", "completed"):
+                    return {**out, "outcome": "already"}
+                if status in ("rejected", "cancelled_by_client", "cancelled_by_admin"):
+                    return {**out, "outcome": "inactive"}
+
+                cur = await db.execute(
+                    """
+                    SELECT 1
+                    FROM bookings
+                    WHERE date = ?
+                      AND status IN ('pending', 'approved')
+                      AND id != ?
+                      AND start_min < ?
+                      AND end_min > ?
+                    LIMIT 1
+                    """,
+                    (row["date"], int(booking_id), row["end_min"], row["start_min"]),
+                )
+                outcome = "conflict" if await cur.fetchone() is not None else "approved"
+                await db.execute(
+                    f"UPDATE bookings SET status = ?, updated_at = {_SQL_UTC_NOW} WHERE id = ?",
+                    ("rejected" if outcome == "conflict" else "approved", int(booking_id)),
+                )
+        finally:
+            _invalidate_day_bookings_cache()
+        return {**out, "outcome": outcome}
 
 
 async def get_booking_with_client_admin(booking_id: int):
@@ -1138,20 +1553,20 @@ async def get_booking_with_client_admin(booking_id: int):
       client_tg_id, client_full_name
     )
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT
-                b.id, b.date, b.time, b.status,
-                b.service_text, b.price_text, b.duration_minutes,
-                u.id as tg_id, u.full_name
-            FROM bookings b
-            LEFT JOIN users u ON u.id = b.client_id
-            WHERE b.id = ?
-            """,
-            (int(booking_id),),
-        )
-        row = await cur.fetchone()
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT
+            b.id, b.date, b.time, b.status,
+            b.service_text, b.price_text, b.duration_minutes,
+            u.id as tg_id, u.full_name
+        FROM bookings b
+        LEFT JOIN users u ON u.id = b.client_id
+        WHERE b.id = ?
+        """,
+        (int(booking_id),),
+    )
+    row = await cur.fetchone()
 
     if not row:
         return None
@@ -1176,18 +1591,25 @@ async def get_booked_times_for_date_admin(date_str: str) -> List[str]:
     """
     Старти часу, які вже зайняті активними записами (pending/approved) + completed.
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT time
-            FROM bookings
-            WHERE date = ?
-              AND status IN ('pending','approved','completed')
-            """,
-            (date_str,),
-        )
-        rows = await cur.fetchall()
-    return [r[0] for r in rows]
+    key = ("get_booked_times_for_date_admin", date_str)
+    cached = _admin_cache_get(key)
+    if cached is not None:
+        return list(cached)
+
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT time
+        FROM bookings
+        WHERE date = ?
+          AND status IN ('pending','approved','completed')
+        """,
+        (date_str,),
+    )
+    out = [r[0] for r in await cur.fetchall()]
+    _admin_cache_put(key, gen, out)
+    return list(out)
 
 
 async def get_report_overview_admin(start_date: str, end_date: str) -> Tuple[int, int]:
@@ -1195,73 +1617,94 @@ async def get_report_overview_admin(start_date: str, end_date: str) -> Tuple[int
     total_bookings, unique_clients
     рахуємо записи зі статусом approved/completed
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT
-                COUNT(*) as total,
-                COUNT(DISTINCT client_id) as uniq
-            FROM bookings
-            WHERE date BETWEEN ? AND ?
-              AND status IN ('approved','completed')
-            """,
-            (start_date, end_date),
-        )
-        row = await cur.fetchone()
-    return int(row[0] or 0), int(row[1] or 0)
+    key = ("get_report_overview_admin", start_date, end_date)
+    cached = _admin_cache_get(key)
+    if cached is not None:
+        return cached
+
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT
+            COUNT(*) as total,
+            COUNT(DISTINCT client_id) as uniq
+        FROM bookings
+        WHERE date BETWEEN ? AND ?
+          AND status IN ('approved','completed')
+        """,
+        (start_date, end_date),
+    )
+    row = await cur.fetchone()
+    out = (int(row[0] or 0), int(row[1] or 0))
+    if out[0]:
+        _admin_cache_put(key, gen, out)
+    return out
 
 
 async def get_report_by_period_admin(start_date: str, end_date: str) -> List[Tuple[str, int]]:
     """
     (service_text, cnt)
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT service_text, COUNT(*) as cnt
-            FROM bookings
-            WHERE date BETWEEN ? AND ?
-              AND status IN ('approved','completed')
-            GROUP BY service_text
-            ORDER BY cnt DESC
-            """,
-            (start_date, end_date),
-        )
-        rows = await cur.fetchall()
-    return [(r[0], int(r[1] or 0)) for r in rows]
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT service_text, COUNT(*) as cnt
+        FROM bookings
+        WHERE date BETWEEN ? AND ?
+          AND status IN ('approved','completed')
+        GROUP BY service_text
+        ORDER BY cnt DESC
+        """,
+        (start_date, end_date),
+    )
+    rows = await cur.fetchall()
+    return [tuple(r) for r in rows]
 
 
 async def get_all_client_tg_ids() -> List[int]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute("SELECT id FROM users")
-        rows = await cur.fetchall()
-    return [int(r[0]) for r in rows]
+    key = ("get_all_client_tg_ids",)
+    cached = _admin_cache_get(key)
+    if cached is not None:
+        return list(cached)
+
+    gen = _cache_gen
+    db = await get_db()
+    cur = await db.execute("SELECT id FROM users")
+    out = [r[0] for r in await cur.fetchall()]
+    _admin_cache_put(key, gen, out)
+    return list(out)
 
 
 async def get_clients_with_stats_admin(limit: int = 50):
     """
     (tg_id, full_name, phone, total_all, total_approved)
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT
-                u.id,
-                COALESCE(u.full_name,'') as full_name,
-                u.phone,
-                COALESCE(COUNT(b.id),0) as total_all,
-                COALESCE(SUM(CASE WHEN b.status IN ('approved','completed') THEN 1 ELSE 0 END),0) as total_ok
-            FROM users u
-            LEFT JOIN bookings b ON b.client_id = u.id
-            GROUP BY u.id
-            ORDER BY total_ok DESC, total_all DESC
-            LIMIT ?
-            """,
-            (int(limit),),
-        )
-        rows = await cur.fetchall()
-
-    return [(int(r[0]), r[1], r[2], int(r[3] or 0), int(r[4] or 0)) for r in rows]
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT
+            u.id,
+            COALESCE(u.full_name,'') as full_name,
+            u.phone,
+            COALESCE(s.total_all,0) as total_all,
+            COALESCE(s.total_ok,0) as total_ok
+        FROM users u
+        LEFT JOIN (
+            -- агрегат один раз по індексу (client_id, status), а не по join-у users x bookings
+            SELECT client_id,
+                   COUNT(*) AS total_all,
+                   SUM(status IN ('approved','completed')) AS total_ok
+            FROM bookings
+            GROUP BY client_id
+        ) s ON s.client_id = u.id
+        ORDER BY total_ok DESC, total_all DESC
+        LIMIT ?
+        """,
+        (int(limit),),
+    )
+    # COUNT/COALESCE(SUM) не бувають NULL
+    return [tuple(r) async for r in _iter_rows(cur)]
 
 
 async def get_client_stats_admin(tg_id: int | None = None, username: str | None = None):
@@ -1276,25 +1719,25 @@ async def get_client_stats_admin(tg_id: int | None = None, username: str | None
     if tg_id is None:
         return None
 
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute(
-            """
-            SELECT
-                COALESCE(u.full_name,'') as full_name,
-                u.phone,
-                COALESCE(COUNT(b.id),0) as total_all,
-                COALESCE(SUM(CASE WHEN b.status IN ('approved','completed') THEN 1 ELSE 0 END),0) as total_ok,
-                MIN(b.date) as first_date,
-                MAX(b.date) as last_date
-            FROM users u
-            LEFT JOIN bookings b ON b.client_id = u.id
-            WHERE u.id = ?
-            GROUP BY u.id
-            LIMIT 1
-            """,
-            (int(tg_id),),
-        )
-        r = await cur.fetchone()
+    db = await get_db()
+    cur = await db.execute(
+        """
+        SELECT
+            COALESCE(u.full_name,'') as full_name,
+            u.phone,
+            COALESCE(COUNT(b.id),0) as total_all,
+            COALESCE(SUM(CASE WHEN b.status IN ('approved','completed') THEN 1 ELSE 0 END),0) as total_ok,
+            MIN(b.date) as first_date,
+            MAX(b.date) as last_date
+        FROM users u
+        LEFT JOIN bookings b ON b.client_id = u.id
+        WHERE u.id = ?
+        GROUP BY u.id
+        LIMIT 1
+        """,
+        (int(tg_id),),
+    )
+    r = await cur.fetchone()
 
     if not r:
         return None
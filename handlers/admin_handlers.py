@@ -1,19 +1,25 @@
 # handlers/admin_handlers.py
 from __future__ import annotations
 
+import asyncio
+import inspect
 import logging
+import time
 from datetime import date, datetime, timedelta
-from typing import Optional, List
+from functools import lru_cache, wraps
+from typing import Optional, List, Tuple
 
 from aiogram import Router, F
 from aiogram.filters import Command
+from aiogram.filters.callback_data import CallbackData
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramRetryAfter
 
 from config import settings
 import database as db
+from handlers.ui import render_screen
 
 log = logging.getLogger(__name__)
 
@@ -32,8 +38,56 @@ class AdminState(StatesGroup):
 #  Access control
 # =======================
 
+# settings frozen -> frozenset адмінів фіксуємо при імпорті
+_ADMIN_IDS = settings.admin_ids
+
+
 def is_admin(user_id: int) -> bool:
-    return user_id in settings.admin_ids
+    return user_id in _ADMIN_IDS
+
+
+# (user_id, callback_data) -> (monotonic час, callback.id) останнього тапу;
+# повтор тієї ж кнопки швидше за інтервал ігноруємо
+_TAP_THROTTLE_SECONDS = 0.2
+_last_tap: dict[tuple[int, str], tuple[float, str]] = {}
+
+
+def _is_repeated_tap(callback: CallbackQuery) -> bool:
+    now = time.monotonic()
+    key = (callback.from_user.id, callback.data or "")
+    last = _last_tap.get(key)
+    if last is not None and now - last[0] < _TAP_THROTTLE_SECONDS:
+        # той самий callback.id — хендлер викликав інший хендлер (напр. *_set -> ad_settings), це не повтор
+        return last[1] != callback.id
+    if len(_last_tap) >= 1024:
+        _last_tap.clear()
+    _last_tap[key] = (now, callback.id)
+    return False
+
+
+def admin_only(require_message: bool = True):
+    """
+    Спільні перевірки callback-хендлерів: права адміна і (за замовчуванням) наявність message.
+    Подвійний тап тієї ж кнопки (< 200 мс) не запускає хендлер удруге: без зайвого запису і перемальовки.
+    functools.wraps обов'язковий: aiogram розгортає __wrapped__, щоб підібрати kwargs (state тощо).
+    """
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(callback: CallbackQuery, *args, **kwargs):
+            if callback.from_user.id not in _ADMIN_IDS:
+                await callback.answer("Недостатньо прав.", show_alert=True)
+                return
+            if require_message and not callback.message:
+                await callback.answer()
+                return
+            if _is_repeated_tap(callback):
+                await callback.answer()
+                return
+            return await handler(callback, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 # =======================
@@ -47,26 +101,33 @@ async def _try_delete_message(msg: Message) -> None:
         return
 
 
-async def _clear_flow_keep_ui(state: FSMContext) -> None:
+async def _clear_flow_keep_ui(state: FSMContext, data: Optional[dict] = None) -> dict:
     """
     Очищає FSM, але зберігає admin_ui_msg_id,
     щоб адмін-панель НЕ створювала новий "екран".
     """
-    data = await state.get_data()
+    if data is None:
+        data = await state.get_data()
     ui_msg_id = data.get("admin_ui_msg_id")
-    await state.clear()
+    kept: dict = {}
     if isinstance(ui_msg_id, int) and ui_msg_id > 0:
-        await state.update_data(admin_ui_msg_id=ui_msg_id)
+        # екран той самий -> хеш лишається валідним
+        kept = {"admin_ui_msg_id": ui_msg_id, "admin_ui_hash": data.get("admin_ui_hash")}
+    # state.clear() + update_data() -> два записи замість трьох
+    await state.set_state(None)
+    await state.set_data(kept)
+    return kept
 
 
-async def _ui_get_or_create_screen(message: Message, state: FSMContext) -> int:
-    data = await state.get_data()
+async def _ui_get_or_create_screen(message: Message, state: FSMContext, data: Optional[dict] = None) -> int:
+    if data is None:
+        data = await state.get_data()
     ui_msg_id = data.get("admin_ui_msg_id")
     if isinstance(ui_msg_id, int) and ui_msg_id > 0:
         return ui_msg_id
 
     sent = await message.answer("Адмін-панель завантажується…")
-    await state.update_data(admin_ui_msg_id=sent.message_id)
+    data.update(await state.update_data(admin_ui_msg_id=sent.message_id, admin_ui_hash=None))
     return sent.message_id
 
 
@@ -78,28 +139,25 @@ async def _ui_render(
     text: str,
     reply_markup: Optional[InlineKeyboardMarkup] = None,
     parse_mode: str = "HTML",
+    data: Optional[dict] = None,
+    pressed_msg_id: Optional[int] = None,
 ) -> None:
-    data = await state.get_data()
-    ui_msg_id = data.get("admin_ui_msg_id")
-
-    if isinstance(ui_msg_id, int) and ui_msg_id > 0:
-        try:
-            await bot.edit_message_text(
-                chat_id=chat_id,
-                message_id=ui_msg_id,
-                text=text,
-                reply_markup=reply_markup,
-                parse_mode=parse_mode,
-            )
-            return
-        except TelegramBadRequest as e:
-            # message to edit not found / message is not modified / etc.
-            log.warning("ADMIN UI edit failed: %s", e)
-        except Exception as e:
-            log.exception("ADMIN UI edit unexpected error: %s", e)
-
-    sent = await bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup, parse_mode=parse_mode)
-    await state.update_data(admin_ui_msg_id=sent.message_id)
+    """
+    Рендер екрана через спільний handlers/ui.render_screen (ключі admin_ui_msg_id / admin_ui_hash).
+    pressed_msg_id передаємо лише з CallbackQuery: callback.message.message_id.
+    """
+    await render_screen(
+        bot=bot,
+        chat_id=chat_id,
+        state=state,
+        text=text,
+        reply_markup=reply_markup,
+        parse_mode=parse_mode,
+        data=data,
+        msg_key="admin_ui_msg_id",
+        hash_key="admin_ui_hash",
+        pressed_msg_id=pressed_msg_id,
+    )
 
 
 # =======================
@@ -108,27 +166,90 @@ async def _ui_render(
 
 UA_WEEKDAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд"]
 
-
+# підписи статусів: для екранів адмін-панелі (з емодзі) і для текстових команд
+_STATUS_MAP_UA = {
+    "pending": "⏳ очікує",
+    "approved": "✅ підтверджено",
+    "completed": "🏁 завершено",
+    "rejected": "❌ відхилено",
+    "cancelled_by_client": "🚫 скасовано клієнтом",
+    "cancelled_by_admin": "🚫 скасовано майстром",
+}
+_STATUS_MAP_UA_PLAIN = {
+    "pending": "очікує",
+    "approved": "підтверджено",
+    "completed": "завершено",
+    "rejected": "відхилено",
+    "cancelled_by_client": "скасовано клієнтом",
+    "cancelled_by_admin": "скасовано майстром",
+}
+
+
+@lru_cache(maxsize=1440)
 def _time_to_minutes(t: str) -> int:
-    h = int(t[:2])
-    m = int(t[3:5])
+    h, m = map(int, t.split(":"))
     return h * 60 + m
 
 
+# усі "HH:MM" для 0..1440 хвилин: форматування стає індексом у кортежі
+_MIN_TO_TIME = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(1441))
+
+
 def _minutes_to_time(mm: int) -> str:
-    h = mm // 60
-    m = mm % 60
-    return f"{h:02d}:{m:02d}"
+    if 0 <= mm <= 1440:
+        return _MIN_TO_TIME[mm]
+    # кінець послуги після опівночі ("24:30") — рідкість, форматуємо як раніше
+    return f"{mm // 60:02d}:{mm % 60:02d}"
+
+
+# database.py не змінюється під час роботи процесу -> реалізації шукаємо один раз при імпорті,
+# а не hasattr-ланцюжком на кожен виклик.
+_SET_SHOP_SETTING = getattr(db, "set_shop_setting", None)
+_SHOP_SETTING_SETTERS = {
+    key: getattr(db, fn_name)
+    for key, fn_name in (
+        ("base_grid_minutes", "set_base_grid_minutes"),
+        ("short_service_threshold_minutes", "set_short_service_threshold_minutes"),
+        ("rest_minutes_after_short", "set_rest_minutes_after_short"),
+        ("extra_round_minutes", "set_extra_round_minutes"),
+        ("min_lead_minutes", "set_min_lead_minutes"),
+        ("slot_step_minutes", "set_slot_step_minutes"),  # legacy
+    )
+    if hasattr(db, fn_name)
+}
+_ADD_BREAK = getattr(db, "add_break", None)
+_ADD_BREAK_GLOBAL = getattr(db, "add_break_global", None)
+_REMOVE_BREAK = getattr(db, "remove_break", None) or getattr(db, "delete_break", None)
 
 
-def _ceil_to_step(value: int, step: int) -> int:
-    if step <= 0:
-        return value
-    return ((value + step - 1) // step) * step
+def _resolve_get_global_breaks():
+    """
+    Обирає спосіб читання "глобальних" перерв один раз при імпорті:
+    1) db.get_global_breaks()
+    2) db.get_breaks_for_weekday(None), якщо сигнатура допускає None
+    3) db.get_breaks_for_weekday(0) з фільтром weekday is None
+    """
+    fn = getattr(db, "get_global_breaks", None)
+    if fn is not None:
+        return fn
+
+    by_weekday = getattr(db, "get_breaks_for_weekday", None)
+    if by_weekday is None:
+        return None
+
+    param = inspect.signature(by_weekday).parameters.get("weekday")
+    if param is not None and (param.default is None or "Optional" in str(param.annotation)):
+        async def _via_none() -> List[dict]:
+            return await by_weekday(None) or []
+        return _via_none
+
+    async def _via_filter() -> List[dict]:
+        rows = await by_weekday(weekday=0) or []
+        return [b for b in rows if b.get("weekday") is None]
+    return _via_filter
 
 
-def _overlap(a_s: int, a_e: int, b_s: int, b_e: int) -> bool:
-    return a_s < b_e and b_s < a_e
+_GET_GLOBAL_BREAKS = _resolve_get_global_breaks()
 
 
 async def _set_shop_setting(key: str, value: int) -> None:
@@ -136,99 +257,90 @@ async def _set_shop_setting(key: str, value: int) -> None:
     Підтримує 2 варіанти database.py:
     1) db.set_shop_setting(key, value)
     2) набір специфічних setter-ів
+    Повторний тап на те саме значення не пише в БД (налаштування читаються з кешу).
     """
-    if hasattr(db, "set_shop_setting"):
-        await db.set_shop_setting(key, int(value))
+    value = int(value)
+    if (await db.get_shop_settings()).get(key) == value:
         return
 
-    mapping = {
-        "base_grid_minutes": "set_base_grid_minutes",
-        "short_service_threshold_minutes": "set_short_service_threshold_minutes",
-        "rest_minutes_after_short": "set_rest_minutes_after_short",
-        "extra_round_minutes": "set_extra_round_minutes",
-        "min_lead_minutes": "set_min_lead_minutes",
-        "slot_step_minutes": "set_slot_step_minutes",  # legacy
-    }
-    fn_name = mapping.get(key)
-    if not fn_name or not hasattr(db, fn_name):
+    if _SET_SHOP_SETTING is not None:
+        await _SET_SHOP_SETTING(key, value)
+        return
+
+    setter = _SHOP_SETTING_SETTERS.get(key)
+    if setter is None:
         raise RuntimeError(f"No setter for shop setting: {key}")
 
-    await getattr(db, fn_name)(int(value))
+    await setter(value)
 
 
 async def _get_global_breaks() -> List[dict]:
-    """
-    Безпечний доступ до "глобальних" перерв.
-    Під різні database.py: пробуємо кілька варіантів.
-    """
-    # 1) якщо є спеціальна функція
-    if hasattr(db, "get_global_breaks"):
-        return await db.get_global_breaks()
-
-    # 2) якщо get_breaks_for_weekday приймає weekday=None
-    if hasattr(db, "get_breaks_for_weekday"):
-        try:
-            rows = await db.get_breaks_for_weekday(None)
-            return rows or []
-        except TypeError:
-            pass
-        except Exception as e:
-            log.warning("get_breaks_for_weekday(None) failed: %s", e)
-
-    # 3) fallback: беремо weekday=0 і відфільтровуємо weekday is None
+    """Безпечний доступ до "глобальних" перерв (стратегія обрана при імпорті)."""
+    if _GET_GLOBAL_BREAKS is None:
+        return []
     try:
-        rows = await db.get_breaks_for_weekday(weekday=0)
-        rows = rows or []
-        return [b for b in rows if b.get("weekday") is None]
+        return await _GET_GLOBAL_BREAKS()
     except Exception as e:
-        log.exception("Fallback breaks load failed: %s", e)
+        log.exception("Global breaks load failed: %s", e)
         return []
 
 
 async def _add_break_global(start_time: str, end_time: str) -> None:
-    if hasattr(db, "add_break"):
-        await db.add_break(None, start_time, end_time)
+    if _ADD_BREAK is not None:
+        await _ADD_BREAK(None, start_time, end_time)
         return
-    if hasattr(db, "add_break_global"):
-        await db.add_break_global(start_time, end_time)
+    if _ADD_BREAK_GLOBAL is not None:
+        await _ADD_BREAK_GLOBAL(start_time, end_time)
         return
     raise RuntimeError("No function to add global break in database.py")
 
 
 async def _remove_break(break_id: int) -> None:
-    if hasattr(db, "remove_break"):
-        await db.remove_break(break_id)
-        return
-    if hasattr(db, "delete_break"):
-        await db.delete_break(break_id)
+    if _REMOVE_BREAK is not None:
+        await _REMOVE_BREAK(break_id)
         return
     raise RuntimeError("No function to remove break in database.py")
 
 
+# settings frozen -> заголовок головного екрана теж сталий
+_TXT_ADMIN_MAIN = (
+    "<b>Панель адміністратора</b>\n"
+    f"{settings.shop_name} — {settings.master_name}\n\n"
+    "Оберіть дію нижче:"
+)
+
+# Статичні клавіатури: будуємо один раз при імпорті (ніде не мутуються).
+_KB_ADMIN_MAIN = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="📅 Записи (сьогодні)", callback_data="ad:today")],
+        [InlineKeyboardButton(text="⏳ Pending-заявки", callback_data="ad:pending")],
+        [InlineKeyboardButton(text="📊 Звіти", callback_data="ad:reports")],
+        [InlineKeyboardButton(text="⚙️ Налаштування", callback_data="ad:settings")],
+    ]
+)
+
+_KB_BACK_TO_MAIN = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="⬅️ Назад", callback_data="ad:menu")]])
+
+_KB_REPORTS = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="📆 За сьогодні", callback_data="ad:r:today")],
+        [InlineKeyboardButton(text="📅 За 7 днів", callback_data="ad:r:week")],
+        [InlineKeyboardButton(text="🗓 За 30 днів", callback_data="ad:r:month")],
+        [InlineKeyboardButton(text="⬅️ Назад", callback_data="ad:menu")],
+    ]
+)
+
+
 def _kb_admin_main() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="📅 Записи (сьогодні)", callback_data="ad:today")],
-            [InlineKeyboardButton(text="⏳ Pending-заявки", callback_data="ad:pending")],
-            [InlineKeyboardButton(text="📊 Звіти", callback_data="ad:reports")],
-            [InlineKeyboardButton(text="⚙️ Налаштування", callback_data="ad:settings")],
-        ]
-    )
+    return _KB_ADMIN_MAIN
 
 
 def _kb_back_to_main() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text="⬅️ Назад", callback_data="ad:menu")]])
+    return _KB_BACK_TO_MAIN
 
 
 def _kb_reports() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="📆 За сьогодні", callback_data="ad:r:today")],
-            [InlineKeyboardButton(text="📅 За 7 днів", callback_data="ad:r:week")],
-            [InlineKeyboardButton(text="🗓 За 30 днів", callback_data="ad:r:month")],
-            [InlineKeyboardButton(text="⬅️ Назад", callback_data="ad:menu")],
-        ]
-    )
+    return _KB_REPORTS
 
 
 def _kb_settings_home(s: dict) -> InlineKeyboardMarkup:
@@ -237,7 +349,14 @@ def _kb_settings_home(s: dict) -> InlineKeyboardMarkup:
     rest_short = int(s.get("rest_minutes_after_short", 5))
     extra_round = int(s.get("extra_round_minutes", 15))
     lead = int(s.get("min_lead_minutes", 0))
+    return _kb_settings_home_cached(base_grid, short_thr, rest_short, extra_round, lead)
+
 
+@lru_cache(maxsize=64)
+def _kb_settings_home_cached(
+    base_grid: int, short_thr: int, rest_short: int, extra_round: int, lead: int
+) -> InlineKeyboardMarkup:
+    # вигляд залежить лише від цих 5 чисел, а налаштування змінюються рідко
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [InlineKeyboardButton(text=f"🧱 Сітка: {base_grid} хв (база)", callback_data="ad:set:grid")],
@@ -253,27 +372,39 @@ def _kb_settings_home(s: dict) -> InlineKeyboardMarkup:
     )
 
 
-def _kb_pick_int(current: int, options: List[int], prefix: str) -> InlineKeyboardMarkup:
-    rows: List[List[InlineKeyboardButton]] = []
-    row: List[InlineKeyboardButton] = []
-    for v in options:
-        mark = "✅ " if v == current else ""
-        row.append(InlineKeyboardButton(text=f"{mark}{v}", callback_data=f"{prefix}:{v}"))
-        if len(row) == 4:
-            rows.append(row)
-            row = []
-    if row:
-        rows.append(row)
+def _chunk_rows(buttons: List[InlineKeyboardButton], size: int) -> List[List[InlineKeyboardButton]]:
+    # плоский список кнопок -> рядки по size (останній може бути коротшим)
+    return [buttons[i:i + size] for i in range(0, len(buttons), size)]
+
+
+@lru_cache(maxsize=128)
+def _kb_pick_int(current: int, options: Tuple[int, ...], prefix: str) -> InlineKeyboardMarkup:
+    rows = _chunk_rows(
+        [
+            InlineKeyboardButton(text=f"{'✅ ' if v == current else ''}{v}", callback_data=f"{prefix}:{v}")
+            for v in options
+        ],
+        4,
+    )
     rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="ad:settings")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
 def _kb_weekdays(schedule: dict) -> InlineKeyboardMarkup:
-    rows: List[List[InlineKeyboardButton]] = []
+    days = []
     for wd in range(7):
         s = schedule.get(wd, {"is_working": True, "work_start": "09:00", "work_end": "19:00"})
-        status = "✅" if s["is_working"] else "🚫"
-        text = f"{UA_WEEKDAYS[wd]} {status} {s['work_start']}–{s['work_end']}"
+        days.append((bool(s["is_working"]), s["work_start"], s["work_end"]))
+    return _kb_weekdays_cached(tuple(days))
+
+
+@lru_cache(maxsize=32)
+def _kb_weekdays_cached(days: Tuple[Tuple[bool, str, str], ...]) -> InlineKeyboardMarkup:
+    # days[wd] = (is_working, work_start, work_end); графік змінюється рідко
+    rows: List[List[InlineKeyboardButton]] = []
+    for wd, (is_working, ws, we) in enumerate(days):
+        status = "✅" if is_working else "🚫"
+        text = f"{UA_WEEKDAYS[wd]} {status} {ws}–{we}"
         rows.append([InlineKeyboardButton(text=text, callback_data=f"ad:sch:day:{wd}")])
     rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="ad:settings")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -294,24 +425,22 @@ def _kb_day_edit(wd: int, is_working: bool, ws: str, we: str) -> InlineKeyboardM
     )
 
 
-def _kb_time_pick(wd: int, field: str, current: str) -> InlineKeyboardMarkup:
-    times: List[str] = []
-    for h in range(7, 23):
-        for m in (0, 30):
-            times.append(f"{h:02d}:{m:02d}")
+# ("HH:MM", "HHMM") для вибору часу 07:00…22:30 — сталі, рахуємо один раз
+_TIME_PICK_SLOTS = tuple((f"{h:02d}:{m:02d}", f"{h:02d}{m:02d}") for h in range(7, 23) for m in (0, 30))
+# префікси callback_data для пікера часу: wd 0..6 × ws/we
+_PICK_PREFIX = {(wd, f): f"ad:sch:pick:{wd}:{f}:" for wd in range(7) for f in ("ws", "we")}
 
-    rows: List[List[InlineKeyboardButton]] = []
-    row: List[InlineKeyboardButton] = []
-    for t in times:
-        hhmm = t.replace(":", "")
-        mark = "✅ " if t == current else ""
-        row.append(InlineKeyboardButton(text=f"{mark}{t}", callback_data=f"ad:sch:pick:{wd}:{field}:{hhmm}"))
-        if len(row) == 4:
-            rows.append(row)
-            row = []
-    if row:
-        rows.append(row)
 
+@lru_cache(maxsize=64)
+def _kb_time_pick(wd: int, field: str, current: str) -> InlineKeyboardMarkup:
+    prefix = _PICK_PREFIX[(wd, field)]
+    rows = _chunk_rows(
+        [
+            InlineKeyboardButton(text=f"{'✅ ' if t == current else ''}{t}", callback_data=prefix + hhmm)
+            for t, hhmm in _TIME_PICK_SLOTS
+        ],
+        4,
+    )
     rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data=f"ad:sch:day:{wd}")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
@@ -334,19 +463,20 @@ def _kb_breaks_list(breaks_rows: List[dict]) -> InlineKeyboardMarkup:
 
 
 def _kb_dayoff_14days() -> InlineKeyboardMarkup:
-    today = date.today()
-    rows: List[List[InlineKeyboardButton]] = []
-    row: List[InlineKeyboardButton] = []
+    return _kb_dayoff_14days_for(date.today().toordinal())
+
+
+@lru_cache(maxsize=4)
+def _kb_dayoff_14days_for(today_ord: int) -> InlineKeyboardMarkup:
+    # клавіатура змінюється лише з датою: будуємо раз на день
+    today = date.fromordinal(today_ord)
+    buttons: List[InlineKeyboardButton] = []
     for i in range(14):
         d = today + timedelta(days=i)
         wd = UA_WEEKDAYS[d.weekday()]
-        label = f"{d.strftime('%d.%m')} ({wd})"
-        row.append(InlineKeyboardButton(text=label, callback_data=f"ad:do:pick:{d.isoformat()}"))
-        if len(row) == 2:
-            rows.append(row)
-            row = []
-    if row:
-        rows.append(row)
+        label = f"{d.day:02d}.{d.month:02d} ({wd})"  # те саме, що strftime('%d.%m'), без locale-форматера
+        buttons.append(InlineKeyboardButton(text=label, callback_data=f"ad:do:pick:{d.isoformat()}"))
+    rows = _chunk_rows(buttons, 2)
     rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="ad:settings")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
@@ -376,39 +506,29 @@ async def admin_panel(message: Message, state: FSMContext):
 
     await _try_delete_message(message)
 
-    await _ui_get_or_create_screen(message, state)
+    data = await state.get_data()
+    await _ui_get_or_create_screen(message, state, data)
     await _ui_render(
         bot=message.bot,
         chat_id=message.chat.id,
         state=state,
-        text=(
-            "<b>Панель адміністратора</b>\n"
-            f"{settings.shop_name} — {settings.master_name}\n\n"
-            "Оберіть дію нижче:"
-        ),
+        data=data,
+        text=_TXT_ADMIN_MAIN,
         reply_markup=_kb_admin_main(),
     )
 
 
 @admin_router.callback_query(F.data == "ad:menu")
+@admin_only()
 async def ad_menu(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
-    await _clear_flow_keep_ui(state)
+    data = await _clear_flow_keep_ui(state)
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
-        text=(
-            "<b>Панель адміністратора</b>\n"
-            f"{settings.shop_name} — {settings.master_name}\n\n"
-            "Оберіть дію нижче:"
-        ),
+        data=data,
+        text=_TXT_ADMIN_MAIN,
         reply_markup=_kb_admin_main(),
     )
     await callback.answer()
@@ -419,20 +539,15 @@ async def ad_menu(callback: CallbackQuery, state: FSMContext):
 # =======================
 
 @admin_router.callback_query(F.data == "ad:today")
+@admin_only()
 async def ad_today(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     d = date.today().isoformat()
     rows = await db.get_bookings_for_date_admin(d)
     if not rows:
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
             text=f"На <b>{d}</b> записів немає.",
             reply_markup=_kb_back_to_main(),
@@ -440,43 +555,31 @@ async def ad_today(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    status_map = {
-        "pending": "⏳ очікує",
-        "approved": "✅ підтверджено",
-        "completed": "🏁 завершено",
-        "rejected": "❌ відхилено",
-        "cancelled_by_client": "🚫 скасовано клієнтом",
-        "cancelled_by_admin": "🚫 скасовано майстром",
-    }
-
-    lines = [f"<b>Записи на {d}:</b>\n"]
-    for booking_id, time_str, service_text, client_name, status in rows:
-        lines.append(f"#{booking_id} {time_str} — {service_text} ({client_name}, {status_map.get(status, status)})")
+    body = "\n".join(
+        f"#{booking_id} {time_str} — {service_text} ({client_name}, {_STATUS_MAP_UA.get(status, status)})"
+        for booking_id, time_str, service_text, client_name, status in rows
+    )
 
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
-        text="\n".join(lines),
+        text=f"<b>Записи на {d}:</b>\n\n{body}",
         reply_markup=_kb_back_to_main(),
     )
     await callback.answer()
 
 
 @admin_router.callback_query(F.data == "ad:pending")
+@admin_only()
 async def ad_pending(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     pending = await db.get_pending_bookings_admin()
     if not pending:
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
             text="Немає заявок у статусі <b>pending</b>.",
             reply_markup=_kb_back_to_main(),
@@ -484,32 +587,29 @@ async def ad_pending(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    lines = ["<b>Pending-заявки:</b>\n"]
-    for bid, d_str, time_str, service_text, client_name in pending:
-        lines.append(f"#{bid} {d_str} {time_str} — {service_text} ({client_name})")
+    body = "\n".join(
+        f"#{bid} {d_str} {time_str} — {service_text} ({client_name})"
+        for bid, d_str, time_str, service_text, client_name in pending
+    )
 
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
-        text="\n".join(lines),
+        text=f"<b>Pending-заявки:</b>\n\n{body}",
         reply_markup=_kb_back_to_main(),
     )
     await callback.answer()
 
 
 @admin_router.callback_query(F.data == "ad:reports")
+@admin_only()
 async def ad_reports(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>Звіти</b>\nОберіть період:",
         reply_markup=_kb_reports(),
@@ -517,15 +617,20 @@ async def ad_reports(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-def _period_dates(days_back: int) -> tuple[str, str]:
-    today = date.today()
+def _period_dates(days_back: int, today: Optional[date] = None) -> tuple[str, str]:
+    # today: якщо викликач уже має дату запиту — без повторного date.today()
+    if today is None:
+        today = date.today()
     start = today - timedelta(days=days_back)
     return start.isoformat(), today.isoformat()
 
 
 async def _render_report(bot, chat_id: int, state: FSMContext, start_date: str, end_date: str, title: str):
-    total, unique_clients = await db.get_report_overview_admin(start_date, end_date)
-    details = await db.get_report_by_period_admin(start_date, end_date)
+    # незалежні запити: обидва одразу в черзі з'єднання, без очікування першого
+    (total, unique_clients), details = await asyncio.gather(
+        db.get_report_overview_admin(start_date, end_date),
+        db.get_report_by_period_admin(start_date, end_date),
+    )
 
     if total == 0:
         await _ui_render(
@@ -549,39 +654,24 @@ async def _render_report(bot, chat_id: int, state: FSMContext, start_date: str,
 
 
 @admin_router.callback_query(F.data == "ad:r:today")
+@admin_only()
 async def ad_report_today(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-    d = date.today().isoformat()
-    await _render_report(callback.bot, callback.message.chat.id, state, d, d, "Звіт за сьогодні")
+    start, end = _period_dates(0)
+    await _render_report(callback.bot, callback.message.chat.id, state, start, end, "Звіт за сьогодні")
     await callback.answer()
 
 
 @admin_router.callback_query(F.data == "ad:r:week")
+@admin_only()
 async def ad_report_week(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
     start, end = _period_dates(7)
     await _render_report(callback.bot, callback.message.chat.id, state, start, end, "Звіт за останні 7 днів")
     await callback.answer()
 
 
 @admin_router.callback_query(F.data == "ad:r:month")
+@admin_only()
 async def ad_report_month(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
     start, end = _period_dates(30)
     await _render_report(callback.bot, callback.message.chat.id, state, start, end, "Звіт за останні 30 днів")
     await callback.answer()
@@ -592,18 +682,13 @@ async def ad_report_month(callback: CallbackQuery, state: FSMContext):
 # =======================
 
 @admin_router.callback_query(F.data == "ad:settings")
+@admin_only()
 async def ad_settings(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     s = await db.get_shop_settings()
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>⚙️ Налаштування майстра</b>\nОберіть, що змінюємо:",
         reply_markup=_kb_settings_home(s),
@@ -612,194 +697,110 @@ async def ad_settings(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data == "ad:set:grid")
+@admin_only()
 async def ad_settings_grid_menu(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     s = await db.get_shop_settings()
     cur = int(s.get("base_grid_minutes", 60))
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>🧱 Базова сітка</b>\nПоказувати базові слоти кожні (хв):",
-        reply_markup=_kb_pick_int(cur, [30, 60, 90, 120], "ad:grid"),
+        reply_markup=_kb_pick_int(cur, (30, 60, 90, 120), "ad:grid"),
     )
     await callback.answer()
 
 
-@admin_router.callback_query(F.data.startswith("ad:grid:"))
-async def ad_settings_grid_set(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-
-    minutes = int(callback.data.split(":")[2])
-    try:
-        await _set_shop_setting("base_grid_minutes", minutes)
-    except Exception as e:
-        log.exception("Failed to set base_grid_minutes: %s", e)
-        await callback.answer("Не вдалося змінити сітку.", show_alert=True)
-        return
-
-    await callback.answer("Збережено ✅", show_alert=True)
-    await ad_settings(callback, state)
-
-
 @admin_router.callback_query(F.data == "ad:set:short_thr")
+@admin_only()
 async def ad_settings_short_thr_menu(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     s = await db.get_shop_settings()
     cur = int(s.get("short_service_threshold_minutes", 40))
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>⚡ Поріг короткої послуги</b>\nЯкщо тривалість < цього значення — додаємо 1 додатковий слот у годині:",
-        reply_markup=_kb_pick_int(cur, [20, 30, 35, 40, 45, 50], "ad:shortthr"),
+        reply_markup=_kb_pick_int(cur, (20, 30, 35, 40, 45, 50), "ad:shortthr"),
     )
     await callback.answer()
 
 
-@admin_router.callback_query(F.data.startswith("ad:shortthr:"))
-async def ad_settings_short_thr_set(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-
-    minutes = int(callback.data.split(":")[2])
-    try:
-        await _set_shop_setting("short_service_threshold_minutes", minutes)
-    except Exception as e:
-        log.exception("Failed to set short_service_threshold_minutes: %s", e)
-        await callback.answer("Не вдалося змінити поріг.", show_alert=True)
-        return
-
-    await callback.answer("Збережено ✅", show_alert=True)
-    await ad_settings(callback, state)
-
-
 @admin_router.callback_query(F.data == "ad:set:rest_short")
+@admin_only()
 async def ad_settings_rest_short_menu(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     s = await db.get_shop_settings()
     cur = int(s.get("rest_minutes_after_short", 5))
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>🛑 Пауза після короткої</b>\nСкільки хвилин додавати після короткої послуги перед наступним слотом:",
-        reply_markup=_kb_pick_int(cur, [0, 5, 10, 15], "ad:restshort"),
+        reply_markup=_kb_pick_int(cur, (0, 5, 10, 15), "ad:restshort"),
     )
     await callback.answer()
 
 
-@admin_router.callback_query(F.data.startswith("ad:restshort:"))
-async def ad_settings_rest_short_set(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-
-    minutes = int(callback.data.split(":")[2])
-    try:
-        await _set_shop_setting("rest_minutes_after_short", minutes)
-    except Exception as e:
-        log.exception("Failed to set rest_minutes_after_short: %s", e)
-        await callback.answer("Не вдалося змінити паузу.", show_alert=True)
-        return
-
-    await callback.answer("Збережено ✅", show_alert=True)
-    await ad_settings(callback, state)
-
-
 @admin_router.callback_query(F.data == "ad:set:extra_round")
+@admin_only()
 async def ad_settings_extra_round_menu(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     s = await db.get_shop_settings()
     cur = int(s.get("extra_round_minutes", 15))
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>🔁 Округлення додаткового слоту</b>\nДо яких хвилин округлювати offset (15 => 10:15, 20 => 10:20):",
-        reply_markup=_kb_pick_int(cur, [5, 10, 15, 20, 30], "ad:exround"),
+        reply_markup=_kb_pick_int(cur, (5, 10, 15, 20, 30), "ad:exround"),
     )
     await callback.answer()
 
 
-@admin_router.callback_query(F.data.startswith("ad:exround:"))
-async def ad_settings_extra_round_set(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-
-    minutes = int(callback.data.split(":")[2])
-    try:
-        await _set_shop_setting("extra_round_minutes", minutes)
-    except Exception as e:
-        log.exception("Failed to set extra_round_minutes: %s", e)
-        await callback.answer("Не вдалося змінити округлення.", show_alert=True)
-        return
-
-    await callback.answer("Збережено ✅", show_alert=True)
-    await ad_settings(callback, state)
-
-
 @admin_router.callback_query(F.data == "ad:set:lead")
+@admin_only()
 async def ad_settings_lead_menu(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     s = await db.get_shop_settings()
     cur = int(s.get("min_lead_minutes", 0))
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>⏳ Мінімальний запас</b>\nСкільки хвилин до візиту не показувати слоти:",
-        reply_markup=_kb_pick_int(cur, [0, 15, 30, 60, 120], "ad:lead"),
+        reply_markup=_kb_pick_int(cur, (0, 15, 30, 60, 120), "ad:lead"),
     )
     await callback.answer()
 
 
-@admin_router.callback_query(F.data.startswith("ad:lead:"))
-async def ad_settings_lead_set(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
+# ad:{prefix}:{minutes} -> (ключ shop_settings, текст помилки); один хендлер на всі числові налаштування
+_INT_SETTING_ROUTES = {
+    "grid": ("base_grid_minutes", "Не вдалося змінити сітку."),
+    "shortthr": ("short_service_threshold_minutes", "Не вдалося змінити поріг."),
+    "restshort": ("rest_minutes_after_short", "Не вдалося змінити паузу."),
+    "exround": ("extra_round_minutes", "Не вдалося змінити округлення."),
+    "lead": ("min_lead_minutes", "Не вдалося змінити запас."),
+}
+
+
+class IntSettingCB(CallbackData, prefix="ad"):
+    # ad:{key}:{value}, той самий формат, що будує _kb_pick_int
+    key: str
+    value: int
+
 
-    minutes = int(callback.data.split(":")[2])
+@admin_router.callback_query(IntSettingCB.filter(F.key.in_(_INT_SETTING_ROUTES)))
+@admin_only(require_message=False)
+async def ad_settings_int_set(callback: CallbackQuery, state: FSMContext, callback_data: IntSettingCB):
+    key, error_text = _INT_SETTING_ROUTES[callback_data.key]
     try:
-        await _set_shop_setting("min_lead_minutes", minutes)
+        await _set_shop_setting(key, callback_data.value)
     except Exception as e:
-        log.exception("Failed to set min_lead_minutes: %s", e)
-        await callback.answer("Не вдалося змінити запас.", show_alert=True)
+        log.exception("Failed to set %s: %s", key, e)
+        await callback.answer(error_text, show_alert=True)
         return
 
     await callback.answer("Збережено ✅", show_alert=True)
@@ -807,18 +808,13 @@ async def ad_settings_lead_set(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data == "ad:set:schedule")
+@admin_only()
 async def ad_schedule(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     schedule = await db.get_weekly_schedule()
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>🗓 Графік по днях</b>\nНатисніть день, щоб змінити:",
         reply_markup=_kb_weekdays(schedule),
@@ -827,59 +823,48 @@ async def ad_schedule(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data.startswith("ad:sch:day:"))
+@admin_only()
 async def ad_schedule_day(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     wd = int(callback.data.split(":")[3])
     info = await db.get_day_schedule(wd)
     if not info:
         await callback.answer("Немає даних дня.", show_alert=True)
         return
 
+    await _render_day_edit(callback, state, wd, info["is_working"], info)
+    await callback.answer()
+
+
+async def _render_day_edit(callback: CallbackQuery, state: FSMContext, wd: int, is_working: bool, info: dict) -> None:
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text=f"<b>{UA_WEEKDAYS[wd]}</b>\nНалаштування дня:",
-        reply_markup=_kb_day_edit(wd, info["is_working"], info["work_start"], info["work_end"]),
+        reply_markup=_kb_day_edit(wd, is_working, info["work_start"], info["work_end"]),
     )
-    await callback.answer()
 
 
 @admin_router.callback_query(F.data.startswith("ad:sch:toggle:"))
+@admin_only()
 async def ad_schedule_toggle(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     wd = int(callback.data.split(":")[3])
     info = await db.get_day_schedule(wd)
     if not info:
         await callback.answer("Немає даних дня.", show_alert=True)
         return
 
-    await db.set_day_schedule(wd, is_working=not info["is_working"])
+    is_working = not info["is_working"]
+    await db.set_day_schedule(wd, is_working=is_working)
     await callback.answer("Оновлено ✅", show_alert=True)
-    await ad_schedule_day(callback, state)
+    # перемальовуємо з уже прочитаного info, без повторного get_day_schedule
+    await _render_day_edit(callback, state, wd, is_working, info)
 
 
 @admin_router.callback_query(F.data.startswith("ad:sch:set:ws:"))
+@admin_only()
 async def ad_schedule_pick_ws(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     wd = int(callback.data.split(":")[4])
     info = await db.get_day_schedule(wd)
     if not info:
@@ -889,6 +874,7 @@ async def ad_schedule_pick_ws(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text=f"<b>{UA_WEEKDAYS[wd]}</b>\nОберіть <b>початок</b>:",
         reply_markup=_kb_time_pick(wd, "ws", info["work_start"]),
@@ -897,14 +883,8 @@ async def ad_schedule_pick_ws(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data.startswith("ad:sch:set:we:"))
+@admin_only()
 async def ad_schedule_pick_we(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     wd = int(callback.data.split(":")[4])
     info = await db.get_day_schedule(wd)
     if not info:
@@ -914,6 +894,7 @@ async def ad_schedule_pick_we(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text=f"<b>{UA_WEEKDAYS[wd]}</b>\nОберіть <b>кінець</b>:",
         reply_markup=_kb_time_pick(wd, "we", info["work_end"]),
@@ -922,14 +903,8 @@ async def ad_schedule_pick_we(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data.startswith("ad:sch:pick:"))
+@admin_only()
 async def ad_schedule_apply_time(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     parts = callback.data.split(":")  # ad:sch:pick:{wd}:{field}:{hhmm}
     wd = int(parts[3])
     field = parts[4]  # ws / we
@@ -960,14 +935,8 @@ async def ad_schedule_apply_time(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data == "ad:set:breaks")
+@admin_only()
 async def ad_breaks(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     global_breaks = await _get_global_breaks()
 
     text_lines = ["<b>☕ Перерви (для всіх днів)</b>\n"]
@@ -981,6 +950,7 @@ async def ad_breaks(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="\n".join(text_lines).strip(),
         reply_markup=_kb_breaks_list(global_breaks),
@@ -989,11 +959,8 @@ async def ad_breaks(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data.startswith("ad:br:add:"))
+@admin_only(require_message=False)
 async def ad_breaks_add(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-
     parts = callback.data.split(":")
     st = f"{parts[3][:2]}:{parts[3][2:]}"
     et = f"{parts[4][:2]}:{parts[4][2:]}"
@@ -1009,11 +976,8 @@ async def ad_breaks_add(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data.startswith("ad:br:del:"))
+@admin_only(require_message=False)
 async def ad_breaks_del(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-
     bid = int(callback.data.split(":")[3])
     try:
         await _remove_break(bid)
@@ -1027,17 +991,12 @@ async def ad_breaks_del(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data == "ad:set:dayoff")
+@admin_only()
 async def ad_dayoff_list(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="<b>🚫 Вихідні по датах</b>\nОберіть дату (14 днів вперед):",
         reply_markup=_kb_dayoff_14days(),
@@ -1046,16 +1005,15 @@ async def ad_dayoff_list(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.callback_query(F.data.startswith("ad:do:pick:"))
+@admin_only()
 async def ad_dayoff_pick(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-    if not callback.message:
-        await callback.answer()
-        return
-
     date_str = callback.data.split(":")[3]
     off = await db.is_day_off(date_str)
+    await _render_dayoff(callback, state, date_str, off)
+    await callback.answer()
+
+
+async def _render_dayoff(callback: CallbackQuery, state: FSMContext, date_str: str, off: bool) -> None:
     text = (
         f"<b>{date_str}</b>\n\n"
         f"Статус: {'🚫 вихідний' if off else '✅ робочий'}\n"
@@ -1064,19 +1022,16 @@ async def ad_dayoff_pick(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text=text,
         reply_markup=_kb_dayoff_toggle(date_str, off),
     )
-    await callback.answer()
 
 
 @admin_router.callback_query(F.data.startswith("ad:do:toggle:"))
+@admin_only(require_message=False)
 async def ad_dayoff_toggle(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
-        return
-
     date_str = callback.data.split(":")[3]
     off = await db.is_day_off(date_str)
     if off:
@@ -1086,7 +1041,8 @@ async def ad_dayoff_toggle(callback: CallbackQuery, state: FSMContext):
         await db.add_day_off(date_str)
         await callback.answer("Зроблено вихідним 🚫", show_alert=True)
 
-    await ad_dayoff_pick(callback, state)
+    if callback.message:
+        await _render_dayoff(callback, state, date_str, not off)
 
 
 # =======================
@@ -1113,6 +1069,24 @@ async def date_bookings(message: Message):
     await _send_bookings_for_date(message, parts[1])
 
 
+# запас до ліміту Telegram (4096 символів на повідомлення) з урахуванням HTML-розмітки
+_MESSAGE_CHUNK_CHARS = 3500
+
+
+async def _answer_chunked(message: Message, header: str, lines, sep: str = "\n", parse_mode: Optional[str] = None) -> None:
+    """Довгий список: шлемо частинами до _MESSAGE_CHUNK_CHARS, перша частина з header."""
+    buf = [header]
+    size = len(header)
+    for line in lines:
+        if size + len(sep) + len(line) > _MESSAGE_CHUNK_CHARS and len(buf) > 1:
+            await message.answer(sep.join(buf), parse_mode=parse_mode)
+            buf = []
+            size = -len(sep)
+        buf.append(line)
+        size += len(sep) + len(line)
+    await message.answer(sep.join(buf), parse_mode=parse_mode)
+
+
 @admin_router.message(Command("week"))
 async def week_bookings_cmd(message: Message):
     if not is_admin(message.from_user.id):
@@ -1127,20 +1101,16 @@ async def week_bookings_cmd(message: Message):
         await message.answer(f"Записів на період {start_str} – {end_str} немає.")
         return
 
-    status_map = {
-        "pending": "очікує",
-        "approved": "підтверджено",
-        "completed": "завершено",
-        "rejected": "відхилено",
-        "cancelled_by_client": "скасовано клієнтом",
-        "cancelled_by_admin": "скасовано майстром",
-    }
-
-    lines = []
-    for d_str, time_str, service_text, client_name, status in rows:
-        lines.append(f"{d_str} {time_str} — {service_text} ({client_name}, {status_map.get(status, status)})")
-
-    await message.answer(f"<b>Записи на {start_str} – {end_str}:</b>\n\n" + "\n".join(lines), parse_mode="HTML")
+    sm = _STATUS_MAP_UA_PLAIN.get
+    await _answer_chunked(
+        message,
+        f"<b>Записи на {start_str} – {end_str}:</b>\n",
+        (
+            f"{d_str} {time_str} — {service_text} ({client_name}, {sm(status, status)})"
+            for d_str, time_str, service_text, client_name, status in rows
+        ),
+        parse_mode="HTML",
+    )
 
 
 async def _send_bookings_for_date(message: Message, date_str: str):
@@ -1149,126 +1119,90 @@ async def _send_bookings_for_date(message: Message, date_str: str):
         await message.answer(f"На {date_str} записів немає.")
         return
 
-    status_map = {
-        "pending": "очікує",
-        "approved": "підтверджено",
-        "completed": "завершено",
-        "rejected": "відхилено",
-        "cancelled_by_client": "скасовано клієнтом",
-        "cancelled_by_admin": "скасовано майстром",
-    }
-
-    lines = []
-    for booking_id, time_str, service_text, client_name, status in rows:
-        lines.append(f"#{booking_id} {time_str} — {service_text} ({client_name}, {status_map.get(status, status)})")
+    sm = _STATUS_MAP_UA_PLAIN.get
+    body = "\n".join(
+        f"#{booking_id} {time_str} — {service_text} ({client_name}, {sm(status, status)})"
+        for booking_id, time_str, service_text, client_name, status in rows
+    )
 
-    await message.answer(f"Записи на {date_str}:\n\n" + "\n".join(lines))
+    await message.answer(f"Записи на {date_str}:\n\n{body}")
 
 
 # =======================
 #  Approve / Reject (callbacks)
 # =======================
 
-async def _booking_occupy_minutes(duration_minutes: int, shop: dict) -> int:
-    short_thr = int(shop.get("short_service_threshold_minutes", 40))
-    rest_short = int(shop.get("rest_minutes_after_short", 5))
-    extra_round = int(shop.get("extra_round_minutes", 15))
-
-    d = int(duration_minutes)
-    if d < short_thr:
-        return _ceil_to_step(d + rest_short, extra_round)
-    return d
+async def _finish_decision(callback: CallbackQuery, note: str, client_tg_id: int, client_text: str) -> None:
+    """Позначка в повідомленні адміна + повідомлення клієнту: два незалежні запити, шлемо паралельно."""
+    calls = [callback.bot.send_message(chat_id=client_tg_id, text=client_text)]
+    if callback.message:
+        try:
+            calls.append(callback.message.edit_text(callback.message.text + note))
+        except Exception:
+            pass  # недоступне / без тексту повідомлення — лише клієнту
+    for res in await asyncio.gather(*calls, return_exceptions=True):
+        if isinstance(res, Exception):
+            log.warning("Booking decision notify failed: %s", res)
 
 
 @admin_router.callback_query(F.data.startswith("approve:"))
+@admin_only(require_message=False)
 async def approve_booking(callback: CallbackQuery):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
+    try:
+        booking_id = int(callback.data.rpartition(":")[2])
+    except ValueError:
+        await callback.answer()
         return
-
-    booking_id = int(callback.data.split(":")[1])
-    info = await db.get_booking_with_client_admin(booking_id)
+    info = await db.approve_booking_atomic(booking_id)
     if not info:
         await callback.answer("Запис не знайдено.", show_alert=True)
         return
 
-    (
-        _bid, date_str, time_str, status,
-        service_text, price_text, duration_minutes,
-        client_tg_id, client_name
-    ) = info
-
-    if status in ("approved", "completed"):
+    outcome = info["outcome"]
+    if outcome == "already":
         await callback.answer("Запис уже підтверджений/завершений.", show_alert=True)
         return
-    if status in ("rejected", "cancelled_by_client", "cancelled_by_admin"):
+    if outcome == "inactive":
         await callback.answer("Запис уже неактивний.", show_alert=True)
         return
 
-    shop = await db.get_shop_settings()
-    cand_s = _time_to_minutes(time_str)
-    cand_e = cand_s + await _booking_occupy_minutes(duration_minutes, shop)
-
-    active = await db.get_active_bookings_for_date(date.fromisoformat(date_str))
-    for b in active:
-        if int(b.get("id")) == booking_id:
-            continue
-        bs = _time_to_minutes(b["time"])
-        occ = b.get("occupy_minutes")
-        if occ is None:
-            occ = await _booking_occupy_minutes(int(b["duration_minutes"]), shop)
-        be = bs + int(occ)
-        if _overlap(cand_s, cand_e, bs, be):
-            await db.update_booking_status(booking_id, "rejected")
-            await callback.answer("Конфлікт по часу. Запит відхилено.", show_alert=True)
-
-            if callback.message:
-                try:
-                    await callback.message.edit_text(callback.message.text + "\n\n❌ Автоматично відхилено (конфлікт).")
-                except Exception:
-                    pass
-
-            try:
-                await callback.bot.send_message(
-                    chat_id=client_tg_id,
-                    text="На жаль, цей час уже зайнятий. Оберіть, будь ласка, інший час або день."
-                )
-            except Exception:
-                pass
-            return
+    client_tg_id = info["client_tg_id"]
+    if outcome == "conflict":
+        await callback.answer("Конфлікт по часу. Запит відхилено.", show_alert=True)
+        await _finish_decision(
+            callback,
+            "\n\n❌ Автоматично відхилено (конфлікт).",
+            client_tg_id,
+            "На жаль, цей час уже зайнятий. Оберіть, будь ласка, інший час або день.",
+        )
+        return
 
-    await db.update_booking_status(booking_id, "approved")
     await callback.answer("Запис підтверджено ✅", show_alert=True)
 
-    if callback.message:
-        try:
-            await callback.message.edit_text(callback.message.text + "\n\n✅ Підтверджено.")
-        except Exception:
-            pass
-
-    try:
-        end_time = _minutes_to_time(_time_to_minutes(time_str) + int(duration_minutes))
-        await callback.bot.send_message(
-            chat_id=client_tg_id,
-            text=(
-                f"Ваш запис підтверджено ✅\n\n"
-                f"Послуга: {service_text}\n"
-                f"Дата: {date_str}\n"
-                f"Час: {time_str}–{end_time}\n"
-                f"Барбершоп: {settings.shop_name}, барбер {settings.master_name}."
-            )
-        )
-    except Exception:
-        pass
+    time_str = info["time"]
+    end_time = _minutes_to_time(_time_to_minutes(time_str) + info["duration_minutes"])
+    await _finish_decision(
+        callback,
+        "\n\n✅ Підтверджено.",
+        client_tg_id,
+        (
+            f"Ваш запис підтверджено ✅\n\n"
+            f"Послуга: {info['service_text']}\n"
+            f"Дата: {info['date']}\n"
+            f"Час: {time_str}–{end_time}\n"
+            f"Барбершоп: {settings.shop_name}, барбер {settings.master_name}."
+        ),
+    )
 
 
 @admin_router.callback_query(F.data.startswith("reject:"))
+@admin_only(require_message=False)
 async def reject_booking(callback: CallbackQuery):
-    if not is_admin(callback.from_user.id):
-        await callback.answer("Недостатньо прав.", show_alert=True)
+    try:
+        booking_id = int(callback.data.rpartition(":")[2])
+    except ValueError:
+        await callback.answer()
         return
-
-    booking_id = int(callback.data.split(":")[1])
     info = await db.get_booking_with_client_admin(booking_id)
     if not info:
         await callback.answer("Запис не знайдено.", show_alert=True)
@@ -1286,20 +1220,12 @@ async def reject_booking(callback: CallbackQuery):
 
     await db.update_booking_status(booking_id, "rejected")
     await callback.answer("Запит відхилено ❌", show_alert=True)
-
-    if callback.message:
-        try:
-            await callback.message.edit_text(callback.message.text + "\n\n❌ Відхилено.")
-        except Exception:
-            pass
-
-    try:
-        await callback.bot.send_message(
-            chat_id=client_tg_id,
-            text="На жаль, ваш запит на запис було відхилено ❌\n\nСпробуйте інший час або день."
-        )
-    except Exception:
-        pass
+    await _finish_decision(
+        callback,
+        "\n\n❌ Відхилено.",
+        client_tg_id,
+        "На жаль, ваш запит на запис було відхилено ❌\n\nСпробуйте інший час або день.",
+    )
 
 
 # =======================
@@ -1316,15 +1242,16 @@ async def clients_list_cmd(message: Message):
         await message.answer("Клієнтів поки немає.")
         return
 
-    lines = []
-    for tg_id, full_name, phone, total_all, total_approved in rows:
-        p = phone or "-"
-        lines.append(
+    await _answer_chunked(
+        message,
+        "<b>Клієнти:</b>\n",
+        (
             f"{full_name}\n"
-            f"tg_id: <code>{tg_id}</code>, телефон: {p}, записів: {total_all}, підтверджених: {total_approved}\n"
-        )
-
-    await message.answer("<b>Клієнти:</b>\n\n" + "\n".join(lines), parse_mode="HTML")
+            f"tg_id: <code>{tg_id}</code>, телефон: {phone or '-'}, записів: {total_all}, підтверджених: {total_approved}\n"
+            for tg_id, full_name, phone, total_all, total_approved in rows
+        ),
+        parse_mode="HTML",
+    )
 
 
 @admin_router.message(Command("client"))
@@ -1371,6 +1298,14 @@ async def client_stats_cmd(message: Message):
     await message.answer(text, parse_mode="HTML")
 
 
+# скільки воркерів розсилки одночасно чекають відповіді Telegram
+_BROADCAST_WORKERS = 10
+# спільний темп усіх воркерів: глобальний ліміт Telegram ~30 msg/s, тримаємо запас
+_BROADCAST_RATE = 25
+# скільки разів пробуємо один чат під flood-wait, далі рахуємо як помилку (інакше розсилка може не завершитись)
+_BROADCAST_MAX_ATTEMPTS = 3
+
+
 @admin_router.message(Command("broadcast"))
 async def broadcast_cmd(message: Message):
     if not is_admin(message.from_user.id):
@@ -1391,14 +1326,51 @@ async def broadcast_cmd(message: Message):
         await message.answer("Немає клієнтів для розсилки.")
         return
 
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for uid in tg_ids:
+        queue.put_nowait(uid)
+    attempts: dict[int, int] = {}
     sent = 0
     failed = 0
-    for uid in tg_ids:
-        try:
-            await message.bot.send_message(chat_id=uid, text=text_to_send)
-            sent += 1
-        except Exception:
-            failed += 1
+
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / _BROADCAST_RATE
+    next_at = loop.time()  # найраніший момент наступного надсилання (спільний для всіх воркерів)
+    pace_lock = asyncio.Lock()
+
+    async def _pace() -> None:
+        # кожне надсилання бере свій слот: сумарно не більше _BROADCAST_RATE за секунду
+        nonlocal next_at
+        async with pace_lock:
+            now = loop.time()
+            wait = next_at - now
+            next_at = max(next_at, now) + interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _worker() -> None:
+        nonlocal sent, failed, next_at
+        while True:
+            try:
+                uid = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await _pace()
+            try:
+                await message.bot.send_message(chat_id=uid, text=text_to_send)
+                sent += 1
+            except TelegramRetryAfter as e:
+                # flood control глобальний: пауза для всіх воркерів, чат — назад у чергу
+                next_at = max(next_at, loop.time() + e.retry_after)
+                attempts[uid] = attempts.get(uid, 0) + 1
+                if attempts[uid] >= _BROADCAST_MAX_ATTEMPTS:
+                    failed += 1
+                else:
+                    queue.put_nowait(uid)
+            except Exception:
+                failed += 1
+
+    await asyncio.gather(*(_worker() for _ in range(min(_BROADCAST_WORKERS, len(tg_ids)))))
 
     await message.answer(
         f"Розсилку завершено.\nНадіслано: <b>{sent}</b>\nПомилок: <b>{failed}</b>",
@@ -1410,9 +1382,8 @@ async def broadcast_cmd(message: Message):
 #  Debug fallback (ADMIN ONLY)
 # =======================
 
-@admin_router.callback_query(
-    F.data.startswith("ad:") | F.data.startswith("approve:") | F.data.startswith("reject:")
-)
+# зареєстрований останнім: спрацьовує лише якщо жоден конкретний хендлер вище не підійшов
+@admin_router.callback_query(F.data.startswith(("ad:", "approve:", "reject:")))
 async def _debug_unhandled_admin_callbacks(callback: CallbackQuery):
     await callback.answer("Невідомий ADMIN callback. Дивись лог.", show_alert=True)
     log.warning("UNHANDLED ADMIN CALLBACK: %s", callback.data)
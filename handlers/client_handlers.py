@@ -1,19 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import re
 import time
+import html
 import logging
+from collections import OrderedDict
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
 from aiogram import Router, F
 from aiogram.filters import CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.exceptions import TelegramBadRequest
 
 from config import settings
 from states import BookingState
+from handlers.ui import render_screen
 from keyboards import (
     client_main_menu_inline,
     services_keyboard,
@@ -34,14 +38,16 @@ from database import (
     get_shop_settings,
     get_day_schedule,
     get_breaks_for_weekday,
-    is_day_off,
+    get_working_dates,
+    cache_generation,
 )
 
 log = logging.getLogger(__name__)
 
 client_router = Router()
 
-PHONE_RE = re.compile(r"^380\d{9}$")
+PHONE_RE = re.compile(r"380\d{9}")  # через fullmatch
+_NON_DIGIT_RE = re.compile(r"\D")
 
 SERVICE_CATALOG = {
     "lining": {"name": "Окантовка", "price_text": "100 грн", "duration": 15},
@@ -51,8 +57,40 @@ SERVICE_CATALOG = {
     "beard": {"name": "Борода", "price_text": "150 грн", "duration": 30},
 }
 
+_STATUS_MAP = {
+    "pending": "⏳ Очікує підтвердження",
+    "approved": "✅ Підтверджено",
+    "completed": "🏁 Виконано",
+    "rejected": "❌ Відхилено",
+    "cancelled_by_client": "🚫 Скасовано вами",
+    "cancelled_by_admin": "🚫 Скасовано майстром",
+}
+
+_MY_BOOKING_LINE = (
+    "──────────────\n"
+    "📅 <b>{date}</b>\n"
+    "🕒 {t}–{end}\n"
+    "✂️ {svc} ({price})\n"
+    "⏱ ~{dur} хв\n"
+    "Статус: {status}\n"
+    "ID: <code>{id}</code>\n"
+)
+
 BOOKING_COOLDOWN_SECONDS = 30
-_last_booking_start: dict[int, float] = {}
+_BOOKING_COOLDOWN_MAX_USERS = 10_000
+# uid -> час останнього старту; порядок вставки = порядок часу (див. _mark_booking_start)
+_last_booking_start: "OrderedDict[int, float]" = OrderedDict()
+
+
+def _mark_booking_start(uid: int, now: float) -> None:
+    _last_booking_start[uid] = now
+    _last_booking_start.move_to_end(uid)
+    # записи старші за cooldown нічого не блокують -> викидаємо з початку
+    while _last_booking_start:
+        oldest_uid, ts = next(iter(_last_booking_start.items()))
+        if now - ts < BOOKING_COOLDOWN_SECONDS and len(_last_booking_start) <= _BOOKING_COOLDOWN_MAX_USERS:
+            break
+        del _last_booking_start[oldest_uid]
 
 
 # =========================
@@ -67,26 +105,34 @@ async def _try_delete_message(msg: Message) -> None:
         return
 
 
-async def _clear_flow_keep_ui(state: FSMContext) -> None:
+async def _clear_flow_keep_ui(state: FSMContext, data: Optional[dict] = None) -> dict:
     """
     Очищаємо FSM-стан, але зберігаємо ui_msg_id,
     щоб бот НЕ створював нове повідомлення-екран.
+    Повертає нові дані FSM — їх можна одразу передати в _ui_render(data=...).
     """
-    data = await state.get_data()
+    if data is None:
+        data = await state.get_data()
     ui_msg_id = data.get("ui_msg_id")
-    await state.clear()
+    kept: dict = {}
     if isinstance(ui_msg_id, int) and ui_msg_id > 0:
-        await state.update_data(ui_msg_id=ui_msg_id)
+        # екран той самий -> хеш лишається валідним
+        kept = {"ui_msg_id": ui_msg_id, "ui_hash": data.get("ui_hash")}
+    # state.clear() + update_data() -> два записи замість трьох
+    await state.set_state(None)
+    await state.set_data(kept)
+    return kept
 
 
-async def _ui_get_or_create_screen(message: Message, state: FSMContext) -> int:
-    data = await state.get_data()
+async def _ui_get_or_create_screen(message: Message, state: FSMContext, data: Optional[dict] = None) -> int:
+    if data is None:
+        data = await state.get_data()
     ui_msg_id = data.get("ui_msg_id")
     if isinstance(ui_msg_id, int) and ui_msg_id > 0:
         return ui_msg_id
 
     sent = await message.answer("Завантаження…")
-    await state.update_data(ui_msg_id=sent.message_id)
+    data.update(await state.update_data(ui_msg_id=sent.message_id, ui_hash=None))
     return sent.message_id
 
 
@@ -98,51 +144,59 @@ async def _ui_render(
     text: str,
     reply_markup: Optional[InlineKeyboardMarkup] = None,
     parse_mode: str = "HTML",
+    data: Optional[dict] = None,
+    pressed_msg_id: Optional[int] = None,
 ) -> None:
     """
-    Рендеримо "екран" в одному повідомленні (edit),
-    якщо не виходить — відправляємо нове і запам'ятовуємо його id.
+    Рендер екрана через спільний handlers/ui.render_screen (ключі ui_msg_id / ui_hash).
+    pressed_msg_id передаємо лише з CallbackQuery: callback.message.message_id.
     """
-    data = await state.get_data()
-    ui_msg_id = data.get("ui_msg_id")
-
-    if isinstance(ui_msg_id, int) and ui_msg_id > 0:
-        try:
-            await bot.edit_message_text(
-                chat_id=chat_id,
-                message_id=ui_msg_id,
-                text=text,
-                reply_markup=reply_markup,
-                parse_mode=parse_mode,
-            )
-            return
-        except TelegramBadRequest as e:
-            # Напр.: message is not modified / message to edit not found
-            log.warning("UI edit failed: %s", e)
-        except Exception as e:
-            log.exception("UI edit unexpected error: %s", e)
-
-    sent = await bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup, parse_mode=parse_mode)
-    await state.update_data(ui_msg_id=sent.message_id)
+    await render_screen(
+        bot=bot,
+        chat_id=chat_id,
+        state=state,
+        text=text,
+        reply_markup=reply_markup,
+        parse_mode=parse_mode,
+        data=data,
+        msg_key="ui_msg_id",
+        hash_key="ui_hash",
+        pressed_msg_id=pressed_msg_id,
+    )
 
 
 def _normalize_phone(raw: str) -> str:
-    return re.sub(r"\D", "", raw or "")
+    return _NON_DIGIT_RE.sub("", raw or "")
 
 
 def _is_valid_ua_phone_380(raw: str) -> bool:
-    return bool(PHONE_RE.match(_normalize_phone(raw)))
+    # "+38 (0xx) xxx-xx-xx" з пробілами/дужками вкладається в 32 символи; довше — не телефон
+    if raw and len(raw) > 32:
+        return False
+    return PHONE_RE.fullmatch(_normalize_phone(raw)) is not None
 
 
+@lru_cache(maxsize=256)
 def _time_to_minutes(hhmm: str) -> int:
     h, m = map(int, hhmm.split(":"))
     return h * 60 + m
 
 
+# усі "HH:MM" для 0..1440 хвилин: форматування стає індексом у кортежі
+_MIN_TO_TIME = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(1441))
+
+
 def _minutes_to_time(mm: int) -> str:
-    h = mm // 60
-    m = mm % 60
-    return f"{h:02d}:{m:02d}"
+    if 0 <= mm <= 1440:
+        return _MIN_TO_TIME[mm]
+    # кінець послуги після опівночі — рідкість, форматуємо як раніше
+    return f"{mm // 60:02d}:{mm % 60:02d}"
+
+
+@lru_cache(maxsize=512)
+def _end_time(hhmm: str, duration: int) -> str:
+    # (старт, тривалість) повторюються з невеликої сітки -> кінець рахуємо один раз
+    return _minutes_to_time(_time_to_minutes(hhmm) + duration)
 
 
 def _ceil_to_step(value: int, step: int) -> int:
@@ -151,10 +205,7 @@ def _ceil_to_step(value: int, step: int) -> int:
     return ((value + step - 1) // step) * step
 
 
-def _intervals_overlap(a_start: int, a_end: int, b_start: int, b_end: int) -> bool:
-    return a_start < b_end and b_start < a_end
-
-
+@lru_cache(maxsize=1)
 def _back_menu_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[[InlineKeyboardButton(text="🏠 Меню", callback_data="cl:nav:menu")]]
@@ -166,24 +217,19 @@ def _back_menu_kb() -> InlineKeyboardMarkup:
 # =========================
 
 async def _is_working_date(d: date) -> bool:
-    if await is_day_off(d.isoformat()):
-        return False
-
-    info = await get_day_schedule(d.weekday())
-    if not info:
-        return True  # fallback
-    return bool(info.get("is_working", True))
+    # days_off + графік тижня одним зверненням до кешів database.py (день поза графіком -> робочий)
+    return bool(await get_working_dates((d,)))
 
 
 async def _booking_dates_keyboard_filtered(days_ahead: int = 7) -> InlineKeyboardMarkup:
     today = date.today()
-    dates: list[date] = []
+    dates = await get_working_dates([today + timedelta(days=i) for i in range(days_ahead)])
+    return _dates_keyboard(tuple(dates))
 
-    for i in range(days_ahead):
-        d = today + timedelta(days=i)
-        if await _is_working_date(d):
-            dates.append(d)
 
+@lru_cache(maxsize=16)
+def _dates_keyboard(dates: tuple[date, ...]) -> InlineKeyboardMarkup:
+    # набір робочих дат змінюється раз на добу (або при зміні графіка) -> підписи форматуються один раз
     rows: list[list[InlineKeyboardButton]] = []
 
     if not dates:
@@ -192,7 +238,7 @@ async def _booking_dates_keyboard_filtered(days_ahead: int = 7) -> InlineKeyboar
 
     row: list[InlineKeyboardButton] = []
     for d in dates:
-        label = d.strftime("%d.%m")
+        label = f"{d.day:02d}.{d.month:02d}"
         row.append(InlineKeyboardButton(text=label, callback_data=f"cl:book:date:{d.isoformat()}"))
         if len(row) == 2:
             rows.append(row)
@@ -253,39 +299,63 @@ def _booking_occupy_minutes(
     return duration
 
 
+# (дата, тривалість, покоління кешів БД) -> вільні старти; будь-який запис у БД змінює покоління
+_free_starts_cache: "OrderedDict[tuple[str, int, int], tuple[str, ...]]" = OrderedDict()
+_FREE_STARTS_CACHE_MAX = 256
+
+
 async def _generate_free_starts(
     target_date: date,
     duration_minutes: int,
     active: list[dict],
 ) -> list[str]:
-    if not await _is_working_date(target_date):
+    # сьогодні відсічка залежить від поточного часу -> не кешуємо
+    if target_date == date.today():
+        return await _compute_free_starts(target_date, duration_minutes, active)
+
+    gen = cache_generation()
+    key = (target_date.isoformat(), int(duration_minutes), gen)
+    cached = _free_starts_cache.get(key)
+    if cached is not None:
+        _free_starts_cache.move_to_end(key)
+        return list(cached)
+
+    free = await _compute_free_starts(target_date, duration_minutes, active)
+    if cache_generation() == gen:
+        _free_starts_cache[key] = tuple(free)
+        if len(_free_starts_cache) > _FREE_STARTS_CACHE_MAX:
+            _free_starts_cache.popitem(last=False)
+    return free
+
+
+async def _compute_free_starts(
+    target_date: date,
+    duration_minutes: int,
+    active: list[dict],
+) -> list[str]:
+    # незалежні читання (здебільшого з кешу database.py) — одним gather
+    working, shop, work, breaks = await asyncio.gather(
+        _is_working_date(target_date),
+        get_shop_settings(),
+        _get_work_window_minutes(target_date),
+        _get_break_intervals(target_date),
+    )
+    if not working or not work:
         return []
 
-    shop = await get_shop_settings()
     base_grid = int(shop.get("base_grid_minutes", 60))
     short_threshold = int(shop.get("short_service_threshold_minutes", 40))
     rest_after_short = int(shop.get("rest_minutes_after_short", 5))
     extra_round = int(shop.get("extra_round_minutes", 15))
     lead = int(shop.get("min_lead_minutes", 0))
-
-    work = await _get_work_window_minutes(target_date)
-    if not work:
-        return []
     start_day, end_day = work
 
+    # зайнятість — збережена в броні (як end_min у перевірці перетину при вставці/підтвердженні),
+    # а не перерахована з поточних налаштувань: інакше після їх зміни список і вставка розходяться
     busy: list[tuple[int, int]] = []
     for b in active:
         s = _time_to_minutes(b["time"])
-        dur = int(b["duration_minutes"])
-        occ = _booking_occupy_minutes(
-            dur,
-            short_threshold=short_threshold,
-            rest_after_short=rest_after_short,
-            extra_round=extra_round
-        )
-        busy.append((s, s + occ))
-
-    breaks = await _get_break_intervals(target_date)
+        busy.append((s, s + int(b["occupy_minutes"] or b["duration_minutes"])))
 
     cutoff = start_day
     if target_date == date.today():
@@ -293,53 +363,44 @@ async def _generate_free_starts(
         now_min = now.hour * 60 + now.minute
         cutoff = max(cutoff, now_min + lead)
 
-    candidates: list[int] = []
+    # броні + перерви -> відсортовані неперетинні блоки: кінці теж зростають, тож курсор лише рухається вперед
+    blocks: list[tuple[int, int]] = []
+    for bs, be in sorted(busy + breaks):
+        if blocks and bs <= blocks[-1][1]:
+            if be > blocks[-1][1]:
+                blocks[-1] = (blocks[-1][0], be)
+        else:
+            blocks.append((bs, be))
+
+    dur = int(duration_minutes)
+    # коротка послуга: додатковий старт усередині кроку сітки (лише якщо вміщається до наступного)
+    offset = 0
+    if dur < short_threshold:
+        offset = _ceil_to_step(dur + rest_after_short, extra_round)
+        if offset >= base_grid:
+            offset = 0
 
     first = (start_day // base_grid) * base_grid
     if first < start_day:
         first += base_grid
+    last_start = end_day - dur
 
+    # кандидати t, t + offset по сітці вже зростають: фільтр і перевірка блоків за один прохід
+    free: list[str] = []
+    idx = 0
+    n_blocks = len(blocks)
     t = first
     while t < end_day:
-        candidates.append(t)
-
-        if int(duration_minutes) < short_threshold:
-            offset = _ceil_to_step(int(duration_minutes) + rest_after_short, extra_round)
-            extra_start = t + offset
-            if extra_start < t + base_grid and extra_start + int(duration_minutes) <= end_day:
-                candidates.append(extra_start)
-
+        for s in ((t, t + offset) if offset else (t,)):
+            if s < cutoff or s > last_start:
+                continue
+            while idx < n_blocks and blocks[idx][1] <= s:
+                idx += 1
+            if idx < n_blocks and blocks[idx][0] < s + dur:
+                continue
+            free.append(_minutes_to_time(s))
         t += base_grid
 
-    filtered: list[int] = []
-    for s in sorted(set(candidates)):
-        if s < start_day or s + int(duration_minutes) > end_day:
-            continue
-        if target_date == date.today() and s < cutoff:
-            continue
-        filtered.append(s)
-
-    free: list[str] = []
-    for s in filtered:
-        e = s + int(duration_minutes)
-
-        ok = True
-        for bs, be in busy:
-            if _intervals_overlap(s, e, bs, be):
-                ok = False
-                break
-        if not ok:
-            continue
-
-        for bs, be in breaks:
-            if _intervals_overlap(s, e, bs, be):
-                ok = False
-                break
-        if not ok:
-            continue
-
-        free.append(_minutes_to_time(s))
-
     return free
 
 
@@ -349,15 +410,16 @@ async def _generate_free_starts(
 
 @client_router.message(CommandStart())
 async def cmd_start(message: Message, state: FSMContext):
-    await _clear_flow_keep_ui(state)
+    data = await _clear_flow_keep_ui(state)
     await upsert_user(message.from_user.id, message.from_user.full_name)
     await _try_delete_message(message)
 
-    await _ui_get_or_create_screen(message, state)
+    await _ui_get_or_create_screen(message, state, data)
     await _ui_render(
         bot=message.bot,
         chat_id=message.chat.id,
         state=state,
+        data=data,
         text="Привіт! Це бот запису до барбера 💈\nОберіть дію нижче.",
         reply_markup=client_main_menu_inline(),
     )
@@ -369,11 +431,13 @@ async def to_menu(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    await _clear_flow_keep_ui(state)
+    data = await _clear_flow_keep_ui(state)
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text="Оберіть дію нижче:",
         reply_markup=client_main_menu_inline(),
     )
@@ -386,7 +450,7 @@ async def menu_contacts(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    await _clear_flow_keep_ui(state)
+    data = await _clear_flow_keep_ui(state)
 
     text = (
         f"💈 <b>Барбершоп {settings.shop_name}</b>\n\n"
@@ -403,7 +467,9 @@ async def menu_contacts(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text=text,
         reply_markup=_back_menu_kb(),
     )
@@ -427,6 +493,7 @@ async def start_booking(callback: CallbackQuery, state: FSMContext):
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
             text=f"Зачекайте <b>{wait} с</b> і спробуйте ще раз.",
             reply_markup=_back_menu_kb(),
@@ -434,16 +501,18 @@ async def start_booking(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    _last_booking_start[callback.from_user.id] = now
+    _mark_booking_start(callback.from_user.id, now)
 
-    await _clear_flow_keep_ui(state)
+    data = await _clear_flow_keep_ui(state)
     await state.set_state(BookingState.choosing_date)
 
     kb = await _booking_dates_keyboard_filtered(days_ahead=7)
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text="Оберіть дату для запису:",
         reply_markup=kb,
     )
@@ -464,6 +533,7 @@ async def choose_date(callback: CallbackQuery, state: FSMContext):
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
             text="Цей день зараз <b>неробочий</b>. Оберіть іншу дату:",
             reply_markup=kb,
@@ -471,13 +541,15 @@ async def choose_date(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    await state.update_data(date_str=date_str)
+    data = await state.update_data(date_str=date_str)
     await state.set_state(BookingState.choosing_service)
 
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text=f"Оберіть послугу на <b>{target.strftime('%d.%m.%Y')}</b>:",
         reply_markup=services_keyboard(),
     )
@@ -499,11 +571,13 @@ async def choose_service(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     date_str = data.get("date_str")
     if not date_str:
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state, data)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="Стан загубився. Повертаю в меню.",
             reply_markup=client_main_menu_inline(),
         )
@@ -518,7 +592,9 @@ async def choose_service(callback: CallbackQuery, state: FSMContext):
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="День став <b>неробочим</b>. Оберіть іншу дату:",
             reply_markup=kb,
         )
@@ -534,7 +610,9 @@ async def choose_service(callback: CallbackQuery, state: FSMContext):
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text=(
                 f"На <b>{target.strftime('%d.%m.%Y')}</b> немає доступного часу для:\n"
                 f"— <b>{svc['name']}</b> ({svc['price_text']}, ~{duration} хв)\n\n"
@@ -545,7 +623,7 @@ async def choose_service(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    await state.update_data(
+    data = await state.update_data(
         service_code=code,
         service_text=svc["name"],
         price_text=svc["price_text"],
@@ -556,7 +634,9 @@ async def choose_service(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text=(
             f"Оберіть час на <b>{target.strftime('%d.%m.%Y')}</b>:\n"
             f"Послуга: <b>{svc['name']}</b> — {svc['price_text']} (~{duration} хв)"
@@ -575,13 +655,15 @@ async def choose_time(callback: CallbackQuery, state: FSMContext):
     payload = callback.data.split("cl:book:time:", 1)[1]
     date_str, time_str = payload.split(":", 1)
 
-    await state.update_data(time_str=time_str)
+    data = await state.update_data(time_str=time_str)
     await state.set_state(BookingState.waiting_phone)
 
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text=(
             "Вкажіть ваш номер телефону.\n\n"
             "<b>Формат:</b> 12 цифр, починається з 380.\n"
@@ -624,13 +706,14 @@ async def get_phone(message: Message, state: FSMContext):
 
     phone = _normalize_phone(raw)
     await update_user_phone(message.from_user.id, phone)
-    await state.update_data(phone=phone)
+    data = await state.update_data(phone=phone)
 
     await state.set_state(BookingState.waiting_full_name)
     await _ui_render(
         bot=message.bot,
         chat_id=message.chat.id,
         state=state,
+        data=data,
         text="Напишіть ваше ім'я та прізвище (як вас підписати в записі).",
         reply_markup=InlineKeyboardMarkup(
             inline_keyboard=[
@@ -656,9 +739,8 @@ async def get_full_name(message: Message, state: FSMContext):
         )
         return
 
-    await state.update_data(client_name=full_name)
-
-    data = await state.get_data()
+    # ім'я — довільний текст користувача: екрануємо один раз і зберігаємо для всіх HTML-екранів
+    data = await state.update_data(client_name=full_name, client_name_html=html.escape(full_name))
     date_str = data["date_str"]
     time_str = data["time_str"]
     service_text = data["service_text"]
@@ -667,7 +749,7 @@ async def get_full_name(message: Message, state: FSMContext):
     phone = data["phone"]
 
     target = date.fromisoformat(date_str)
-    end_time = _minutes_to_time(_time_to_minutes(time_str) + duration_minutes)
+    end_time = _end_time(time_str, duration_minutes)
 
     text = (
         "<b>Перевірте дані запису:</b>\n\n"
@@ -676,7 +758,7 @@ async def get_full_name(message: Message, state: FSMContext):
         f"✂️ Послуга: <b>{service_text}</b>\n"
         f"⏱ Тривалість: ~{duration_minutes} хв\n"
         f"💳 Вартість: {price_text}\n"
-        f"👤 ПІБ: {full_name}\n"
+        f"👤 ПІБ: {data['client_name_html']}\n"
         f"📞 Телефон: {phone}\n\n"
         "Підтвердити запис?"
     )
@@ -686,6 +768,7 @@ async def get_full_name(message: Message, state: FSMContext):
         bot=message.bot,
         chat_id=message.chat.id,
         state=state,
+        data=data,
         text=text,
         reply_markup=client_confirm_keyboard(),
     )
@@ -698,11 +781,13 @@ async def confirm_booking(callback: CallbackQuery, state: FSMContext):
         return
 
     if callback.data == "cl:book:cancel":
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="Запис скасовано. Якщо потрібно — почніть запис заново.",
             reply_markup=client_main_menu_inline(),
         )
@@ -712,11 +797,13 @@ async def confirm_booking(callback: CallbackQuery, state: FSMContext):
     today_str = date.today().isoformat()
     active_today = await count_client_active_requests_for_day(callback.from_user.id, today_str)
     if active_today >= 1:
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text=(
                 "У вас вже є активна заявка на сьогодні (очікує або підтверджена).\n"
                 "Дочекайтеся відповіді майстра або скасуйте попередню заявку."
@@ -735,15 +822,18 @@ async def confirm_booking(callback: CallbackQuery, state: FSMContext):
     price_text = data["price_text"]
     phone = data["phone"]
     client_name = data["client_name"]
+    client_name_html = data.get("client_name_html") or html.escape(client_name)
 
     target = date.fromisoformat(date_str)
 
     if not await _is_working_date(target):
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state, data)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="На жаль, день став неробочим. Оберіть іншу дату/час.",
             reply_markup=client_main_menu_inline(),
         )
@@ -777,11 +867,13 @@ async def confirm_booking(callback: CallbackQuery, state: FSMContext):
             occupy_minutes=occupy,
         )
     except ValueError:
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state, data)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="На жаль, цей час щойно зайняли. Оберіть інший час.",
             reply_markup=client_main_menu_inline(),
         )
@@ -789,23 +881,27 @@ async def confirm_booking(callback: CallbackQuery, state: FSMContext):
         return
     except Exception as e:
         log.exception("create_booking_atomic failed: %s", e)
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state, data)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="Сталася помилка при створенні запису. Спробуйте пізніше.",
             reply_markup=client_main_menu_inline(),
         )
         await callback.answer()
         return
 
-    await _clear_flow_keep_ui(state)
+    data = await _clear_flow_keep_ui(state, data)
 
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text="Ваш запит на запис надіслано майстру. Очікуйте підтвердження 💈",
         reply_markup=client_main_menu_inline(),
     )
@@ -813,7 +909,7 @@ async def confirm_booking(callback: CallbackQuery, state: FSMContext):
     # повідомлення адмінам
     from keyboards import admin_booking_decision_keyboard
 
-    end_time = _minutes_to_time(_time_to_minutes(time_str) + duration_minutes)
+    end_time = _end_time(time_str, duration_minutes)
     text_for_admin = (
         "<b>Нова заявка на запис:</b>\n\n"
         f"💈 {settings.shop_name} / {settings.master_name}\n"
@@ -822,21 +918,29 @@ async def confirm_booking(callback: CallbackQuery, state: FSMContext):
         f"✂️ Послуга: <b>{service_text}</b>\n"
         f"⏱ Тривалість: ~{duration_minutes} хв\n"
         f"💳 Вартість: {price_text}\n"
-        f"👤 ПІБ: {client_name}\n"
+        f"👤 ПІБ: {client_name_html}\n"
         f"📞 Телефон: {phone}\n"
         f"ID заявки: <code>{booking_id}</code>"
     )
 
-    for admin_id in settings.admin_ids:
-        try:
-            await callback.bot.send_message(
+    # усім адмінам паралельно; клавіатура однакова для всіх
+    admin_ids = list(settings.admin_ids)
+    decision_kb = admin_booking_decision_keyboard(booking_id)
+    results = await asyncio.gather(
+        *(
+            callback.bot.send_message(
                 chat_id=admin_id,
                 text=text_for_admin,
-                reply_markup=admin_booking_decision_keyboard(booking_id),
+                reply_markup=decision_kb,
                 parse_mode="HTML",
             )
-        except Exception as e:
-            log.warning("Failed to notify admin %s: %s", admin_id, e)
+            for admin_id in admin_ids
+        ),
+        return_exceptions=True,
+    )
+    for admin_id, res in zip(admin_ids, results):
+        if isinstance(res, Exception):
+            log.warning("Failed to notify admin %s: %s", admin_id, res)
 
     await callback.answer()
 
@@ -856,6 +960,7 @@ async def nav_dates(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
         text="Оберіть дату для запису:",
         reply_markup=kb,
@@ -872,11 +977,13 @@ async def nav_services(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     date_str = data.get("date_str")
     if not date_str:
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state, data)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="Повертаю в меню.",
             reply_markup=client_main_menu_inline(),
         )
@@ -890,7 +997,9 @@ async def nav_services(callback: CallbackQuery, state: FSMContext):
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="День став <b>неробочим</b>. Оберіть іншу дату:",
             reply_markup=kb,
         )
@@ -901,7 +1010,9 @@ async def nav_services(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text=f"Оберіть послугу на <b>{target.strftime('%d.%m.%Y')}</b>:",
         reply_markup=services_keyboard(),
     )
@@ -919,11 +1030,13 @@ async def nav_times(callback: CallbackQuery, state: FSMContext):
     service_code = data.get("service_code")
 
     if not date_str or not service_code or service_code not in SERVICE_CATALOG:
-        await _clear_flow_keep_ui(state)
+        data = await _clear_flow_keep_ui(state, data)
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="Повертаю в меню.",
             reply_markup=client_main_menu_inline(),
         )
@@ -937,7 +1050,9 @@ async def nav_times(callback: CallbackQuery, state: FSMContext):
         await _ui_render(
             bot=callback.bot,
             chat_id=callback.message.chat.id,
+            pressed_msg_id=callback.message.message_id,
             state=state,
+            data=data,
             text="День став <b>неробочим</b>. Оберіть іншу дату:",
             reply_markup=kb,
         )
@@ -954,7 +1069,9 @@ async def nav_times(callback: CallbackQuery, state: FSMContext):
     await _ui_render(
         bot=callback.bot,
         chat_id=callback.message.chat.id,
+        pressed_msg_id=callback.message.message_id,
         state=state,
+        data=data,
         text=(
             f"Оберіть час на <b>{target.strftime('%d.%m.%Y')}</b>:\n"
             f"Послуга: <b>{svc['name']}</b> — {svc['price_text']} (~{duration} хв)"
@@ -968,49 +1085,43 @@ async def nav_times(callback: CallbackQuery, state: FSMContext):
 #  MY BOOKINGS (INLINE)
 # =======================
 
-@client_router.callback_query(F.data == "cl:menu:my")
-async def my_bookings(callback: CallbackQuery, state: FSMContext):
-    if not callback.message:
-        await callback.answer()
-        return
-
-    await _clear_flow_keep_ui(state)
-    bookings = await get_client_bookings(callback.from_user.id, limit=10)
-
+async def _render_my_bookings(
+    *,
+    bot,
+    chat_id: int,
+    state: FSMContext,
+    bookings: list[dict],
+    data: Optional[dict] = None,
+) -> None:
+    """Екран "Мої записи" з уже отриманого списку (без запиту до БД)."""
     if not bookings:
         await _ui_render(
-            bot=callback.bot,
-            chat_id=callback.message.chat.id,
+            bot=bot,
+            chat_id=chat_id,
             state=state,
+            data=data,
             text="У вас поки немає записів.",
             reply_markup=_back_menu_kb(),
         )
-        await callback.answer()
         return
 
-    status_map = {
-        "pending": "⏳ Очікує підтвердження",
-        "approved": "✅ Підтверджено",
-        "completed": "🏁 Виконано",
-        "rejected": "❌ Відхилено",
-        "cancelled_by_client": "🚫 Скасовано вами",
-        "cancelled_by_admin": "🚫 Скасовано майстром",
-    }
-
     lines = ["<b>📋 Ваші останні записи:</b>\n"]
+    fmt = _MY_BOOKING_LINE.format
     for b in bookings:
-        d = date.fromisoformat(b["date"])
+        ds = b["date"]  # YYYY-MM-DD -> DD.MM.YYYY без fromisoformat/strftime
         t = b["time"]
         dur = int(b["duration_minutes"])
-        end_time = _minutes_to_time(_time_to_minutes(t) + dur)
         lines.append(
-            "──────────────\n"
-            f"📅 <b>{d.strftime('%d.%m.%Y')}</b>\n"
-            f"🕒 {t}–{end_time}\n"
-            f"✂️ {b['service_text']} ({b['price_text']})\n"
-            f"⏱ ~{dur} хв\n"
-            f"Статус: {status_map.get(b['status'], b['status'])}\n"
-            f"ID: <code>{b['id']}</code>\n"
+            fmt(
+                date=f"{ds[8:10]}.{ds[5:7]}.{ds[:4]}",
+                t=t,
+                end=_end_time(t, dur),
+                svc=b["service_text"],
+                price=b["price_text"],
+                dur=dur,
+                status=_STATUS_MAP.get(b["status"], b["status"]),
+                id=b["id"],
+            )
         )
 
     rows: list[list[InlineKeyboardButton]] = []
@@ -1022,12 +1133,30 @@ async def my_bookings(callback: CallbackQuery, state: FSMContext):
     kb = InlineKeyboardMarkup(inline_keyboard=rows)
 
     await _ui_render(
-        bot=callback.bot,
-        chat_id=callback.message.chat.id,
+        bot=bot,
+        chat_id=chat_id,
         state=state,
+        data=data,
         text="\n".join(lines).strip(),
         reply_markup=kb,
     )
+
+
+@client_router.callback_query(F.data == "cl:menu:my")
+async def my_bookings(callback: CallbackQuery, state: FSMContext):
+    if not callback.message:
+        await callback.answer()
+        return
+
+    data = await _clear_flow_keep_ui(state)
+    bookings = await get_client_bookings(callback.from_user.id, limit=10)
+    await _render_my_bookings(
+        bot=callback.bot,
+        chat_id=callback.message.chat.id,
+        state=state,
+        bookings=bookings,
+        data=data,
+    )
     await callback.answer()
 
 
@@ -1037,12 +1166,27 @@ async def my_cancel_booking(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    booking_id = int(callback.data.split("cl:my:cancel:", 1)[1])
+    try:
+        booking_id = int(callback.data.rpartition(":")[2])
+    except ValueError:
+        await callback.answer()
+        return
 
+    # список, з якого натиснули кнопку (зазвичай з кешу); після скасування кеш скинеться
+    bookings = await get_client_bookings(callback.from_user.id, limit=10)
     ok = await cancel_booking_by_client(booking_id, callback.from_user.id)
     if not ok:
         await callback.answer("Не вдалося скасувати (можливо вже неактивний).", show_alert=True)
         return
 
     await callback.answer("Запис скасовано ✅", show_alert=True)
-    await my_bookings(callback, state)
+    # перемальовуємо з пам'яті: статус скасованої броні відомий, повторний SELECT не потрібен
+    for b in bookings:
+        if b["id"] == booking_id:
+            b["status"] = "cancelled_by_client"
+    await _render_my_bookings(
+        bot=callback.bot,
+        chat_id=callback.message.chat.id,
+        state=state,
+        bookings=bookings,
+    )
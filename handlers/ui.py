@@ -1,66 +1,80 @@
 # utils/ui.py
 from __future__ import annotations
 
-from aiogram.types import Message, CallbackQuery
+import hashlib
+import logging
+from typing import Optional
+
+from aiogram.types import InlineKeyboardMarkup
 from aiogram.exceptions import TelegramBadRequest
 
+log = logging.getLogger(__name__)
+
+
+def ui_hash(text: str, reply_markup: Optional[InlineKeyboardMarkup], parse_mode: Optional[str]) -> str:
+    """Короткий стабільний відбиток вмісту екрана (текст + клавіатура + parse_mode)."""
+    markup = reply_markup.model_dump_json(exclude_none=True) if reply_markup is not None else ""
+    return hashlib.blake2b(f"{parse_mode}\0{text}\0{markup}".encode(), digest_size=8).hexdigest()
+
 
-async def show_screen_message(
-    message: Message,
+def _is_not_modified(e: TelegramBadRequest) -> bool:
+    # Telegram: "message is not modified" -> на екрані вже те саме, це не помилка
+    return "message is not modified" in str(e)
+
+
+async def render_screen(
+    *,
+    bot,
+    chat_id: int,
     state,
     text: str,
-    reply_markup=None,
-    parse_mode: str | None = "HTML",
-):
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+    parse_mode: Optional[str] = "HTML",
+    data: Optional[dict] = None,
+    msg_key: str,
+    hash_key: str,
+    pressed_msg_id: Optional[int] = None,
+) -> None:
     """
-    Показати/оновити 'екран' через Message (команди, кнопки ReplyKeyboard).
-    Зберігаємо last_screen_message_id у FSM state.
+    Рендер "екрана" в одному повідомленні: edit збереженого msg_key,
+    якщо не виходить — нове повідомлення, id якого запам'ятовуємо.
+
+    pressed_msg_id — id повідомлення, по кнопці якого щойно натиснули (лише для CallbackQuery).
+    Пропуск без запиту до Telegram лише коли натиснули саме на екран і вміст той самий:
+    тоді повідомлення точно існує. Команди/текст (pressed_msg_id=None) завжди редагують або
+    надсилають екран — він міг бути видалений чи загублений в історії.
+    data — вже прочитані дані FSM (щоб не робити повторний get_data()).
     """
-    data = await state.get_data()
-    last_id = data.get("last_screen_message_id")
+    if data is None:
+        data = await state.get_data()
+    ui_msg_id = data.get(msg_key)
+    h = ui_hash(text, reply_markup, parse_mode)
 
-    # пробуємо відредагувати попереднє повідомлення
-    if last_id:
+    if isinstance(ui_msg_id, int) and ui_msg_id > 0:
+        if pressed_msg_id == ui_msg_id and data.get(hash_key) == h:
+            return
         try:
-            await message.bot.edit_message_text(
-                chat_id=message.chat.id,
-                message_id=last_id,
+            await bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=ui_msg_id,
                 text=text,
                 reply_markup=reply_markup,
                 parse_mode=parse_mode,
             )
-            # не надсилаємо нових повідомлень
-            return last_id
-        except TelegramBadRequest:
-            # не вдалося відредагувати -> створимо нове
-            pass
+        except TelegramBadRequest as e:
+            if not _is_not_modified(e):
+                # message to edit not found / can't be edited -> новий екран нижче
+                log.warning("UI edit failed (%s): %s", msg_key, e)
+                ui_msg_id = None
+        except Exception as e:
+            log.exception("UI edit unexpected error (%s): %s", msg_key, e)
+            ui_msg_id = None
 
-    sent = await message.answer(text, reply_markup=reply_markup, parse_mode=parse_mode)
-    await state.update_data(last_screen_message_id=sent.message_id)
-    return sent.message_id
-
-
-async def show_screen_callback(
-    callback: CallbackQuery,
-    state,
-    text: str,
-    reply_markup=None,
-    parse_mode: str | None = "HTML",
-):
-    """
-    Показати/оновити 'екран' через CallbackQuery (inline-кнопки).
-    Редагуємо саме повідомлення, по якому натиснули.
-    """
-    try:
-        await callback.message.edit_text(
-            text=text,
-            reply_markup=reply_markup,
-            parse_mode=parse_mode,
-        )
-        await state.update_data(last_screen_message_id=callback.message.message_id)
-    except TelegramBadRequest:
-        # fallback: надіслати нове
-        sent = await callback.message.answer(text, reply_markup=reply_markup, parse_mode=parse_mode)
-        await state.update_data(last_screen_message_id=sent.message_id)
+        if ui_msg_id is not None:
+            # відредаговано або вже показано те саме -> лише оновлюємо хеш, якщо змінився
+            if data.get(hash_key) != h:
+                await state.update_data({hash_key: h})
+            return
 
-    await callback.answer()
+    sent = await bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup, parse_mode=parse_mode)
+    await state.update_data({msg_key: sent.message_id, hash_key: h})
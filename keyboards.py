@@ -1,6 +1,7 @@
 import calendar
 from datetime import date, timedelta
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 
@@ -39,7 +40,9 @@ UA_MONTHS = [
 # =====================
 #  CLIENT (INLINE UI)
 # =====================
+# Сталі клавіатури кешуються (lru_cache): розмітка ніде не мутується, тож один об'єкт на всі виклики.
 
+@lru_cache(maxsize=None)
 def client_main_menu_inline() -> InlineKeyboardMarkup:
     """Головне меню клієнта через inline-кнопки (не створює повідомлень користувача)."""
     return InlineKeyboardMarkup(
@@ -51,16 +54,11 @@ def client_main_menu_inline() -> InlineKeyboardMarkup:
     )
 
 
-def client_nav_row(
-    back_to: Optional[str] = None,
-    *,
-    include_menu: bool = True,
-    include_cancel: bool = False,
-) -> List[InlineKeyboardButton]:
-    """
-    Універсальний ряд навігації для клієнтських екранів.
-    back_to: 'dates' | 'svc' | 'times' | 'menu' (або None)
-    """
+def _build_nav_row(
+    back_to: Optional[str],
+    include_menu: bool,
+    include_cancel: bool,
+) -> Tuple[InlineKeyboardButton, ...]:
     row: List[InlineKeyboardButton] = []
 
     if back_to:
@@ -72,11 +70,43 @@ def client_nav_row(
     if include_cancel:
         row.append(InlineKeyboardButton(text="❌ Скасувати", callback_data="cl:book:cancel"))
 
-    return row
+    return tuple(row)
+
+
+# усі комбінації (back_to, include_menu, include_cancel) -> готові кнопки, будуються один раз
+_NAV_ROWS = {
+    (back_to, menu, cancel): _build_nav_row(back_to, menu, cancel)
+    for back_to in (None, "dates", "svc", "times", "menu")
+    for menu in (False, True)
+    for cancel in (False, True)
+}
+
+
+def client_nav_row(
+    back_to: Optional[str] = None,
+    *,
+    include_menu: bool = True,
+    include_cancel: bool = False,
+) -> List[InlineKeyboardButton]:
+    """
+    Універсальний ряд навігації для клієнтських екранів.
+    back_to: 'dates' | 'svc' | 'times' | 'menu' (або None)
+    """
+    key = (back_to, include_menu, include_cancel)
+    row = _NAV_ROWS.get(key)
+    if row is None:
+        row = _build_nav_row(*key)
+    # новий список щоразу (викликач може додати кнопки), самі кнопки — спільні
+    return list(row)
 
 
 def booking_dates_keyboard(days_ahead: int = 7) -> InlineKeyboardMarkup:
-    today = date.today()
+    # ключ включає сьогоднішню дату -> кеш сам "перевертається" опівночі
+    return _booking_dates_keyboard(date.today(), days_ahead)
+
+
+@lru_cache(maxsize=8)
+def _booking_dates_keyboard(today: date, days_ahead: int) -> InlineKeyboardMarkup:
     buttons: list[list[InlineKeyboardButton]] = []
 
     row: list[InlineKeyboardButton] = []
@@ -98,6 +128,7 @@ def booking_dates_keyboard(days_ahead: int = 7) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=None)
 def services_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -112,6 +143,11 @@ def services_keyboard() -> InlineKeyboardMarkup:
 
 
 def booking_times_keyboard(date_str: str, time_slots: list[str]) -> InlineKeyboardMarkup:
+    return _booking_times_keyboard(date_str, tuple(time_slots))
+
+
+@lru_cache(maxsize=512)
+def _booking_times_keyboard(date_str: str, time_slots: Tuple[str, ...]) -> InlineKeyboardMarkup:
     buttons: list[list[InlineKeyboardButton]] = []
     row: list[InlineKeyboardButton] = []
 
@@ -130,6 +166,7 @@ def booking_times_keyboard(date_str: str, time_slots: list[str]) -> InlineKeyboa
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+@lru_cache(maxsize=None)
 def client_confirm_keyboard() -> InlineKeyboardMarkup:
     """Підтвердження заявки без booking_id (створиться після confirm у БД)."""
     return InlineKeyboardMarkup(
@@ -169,23 +206,31 @@ def client_main_menu_reply() -> ReplyKeyboardMarkup:
 #  ADMIN
 # =====================
 
+# статичні частини календаря: кнопки не мутуються, тож спільні для всіх місяців
+_CAL = calendar.Calendar(firstweekday=0)
+_CAL_WD_HEADER = tuple(InlineKeyboardButton(text=wd, callback_data="admin_cal:noop") for wd in UA_WEEKDAYS_SHORT)
+_CAL_BLANK = InlineKeyboardButton(text=" ", callback_data="admin_cal:noop")
+
 def admin_calendar_keyboard(year: int | None = None, month: int | None = None) -> InlineKeyboardMarkup:
     if year is None or month is None:
         today = date.today()
         year = today.year
         month = today.month
+    return _admin_calendar_keyboard(year, month)
+
 
+@lru_cache(maxsize=24)
+def _admin_calendar_keyboard(year: int, month: int) -> InlineKeyboardMarkup:
     kb: list[list[InlineKeyboardButton]] = []
 
     kb.append([InlineKeyboardButton(text=f"{UA_MONTHS[month]} {year}", callback_data="admin_cal:noop")])
-    kb.append([InlineKeyboardButton(text=wd, callback_data="admin_cal:noop") for wd in UA_WEEKDAYS_SHORT])
+    kb.append(list(_CAL_WD_HEADER))
 
-    cal = calendar.Calendar(firstweekday=0)
-    for week in cal.monthdayscalendar(year, month):
+    for week in _CAL.monthdayscalendar(year, month):
         row: list[InlineKeyboardButton] = []
         for day_num in week:
             if day_num == 0:
-                row.append(InlineKeyboardButton(text=" ", callback_data="admin_cal:noop"))
+                row.append(_CAL_BLANK)
             else:
                 d = date(year, month, day_num)
                 row.append(InlineKeyboardButton(text=str(day_num), callback_data=f"admin_cal:day:{d.isoformat()}"))
@@ -222,6 +267,7 @@ def admin_booking_decision_keyboard(booking_id: int) -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=None)
 def admin_reports_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
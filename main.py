@@ -4,14 +4,26 @@ import logging
 from aiohttp import web
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+
+# Опційно: orjson швидше серіалізує клавіатури/відповіді Telegram (якщо встановлений)
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
 
 from config import settings
+from database import close_db, init_db
 from handlers.admin_handlers import admin_router
 from handlers.client_handlers import client_router
 
 
 log = logging.getLogger(__name__)
 
+# long-poll getUpdates (сек): менше холостих запитів, ніж дефолтні 10 с.
+# Тайм-аут HTTP aiogram сам рахує як session.timeout + polling_timeout.
+POLLING_TIMEOUT = 25
+
 
 async def start_web_server() -> web.AppRunner:
     """HTTP сервер потрібен Render Web Service (Free), щоб був відкритий PORT."""
@@ -37,15 +49,25 @@ async def start_web_server() -> web.AppRunner:
     return runner
 
 
+def _make_session() -> AiohttpSession | None:
+    if orjson is None:
+        return None  # aiogram створить сесію зі stdlib json
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    return AiohttpSession(json_loads=orjson.loads, json_dumps=_dumps)
+
+
 async def start_bot() -> None:
-    bot = Bot(token=settings.bot_token)
+    bot = Bot(token=settings.bot_token, session=_make_session())
     dp = Dispatcher()
 
     dp.include_router(client_router)
     dp.include_router(admin_router)
 
     log.info("BOT polling started")
-    await dp.start_polling(bot)
+    await dp.start_polling(bot, polling_timeout=POLLING_TIMEOUT)
 
 
 async def main() -> None:
@@ -54,6 +76,9 @@ async def main() -> None:
         format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
     )
 
+    # схема/міграції до першого апдейта: помилка БД зупиняє старт, а не перший запис
+    await init_db()
+
     runner = await start_web_server()
 
     bot_task = asyncio.create_task(start_bot(), name="bot_polling")
@@ -66,6 +91,7 @@ async def main() -> None:
     finally:
         log.info("Shutting down WEB server...")
         await runner.cleanup()
+        await close_db()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+os.environ.setdefault("ADMIN_IDS", "1")
+
+import database as db
+
+_DAY = "2030-01-07"
+
+
+def _day(*intervals: tuple[int, int]) -> db._DayBookings:
+    # як у get_active_bookings_for_date: за start_min, max_ends — префіксний максимум end_min
+    intervals = sorted(intervals)
+    max_ends = []
+    top = 0
+    for _, end in intervals:
+        top = max(top, end)
+        max_ends.append(top)
+    return db._DayBookings([{} for _ in intervals], [s for s, _ in intervals], max_ends)
+
+
+class CachedOverlapTest(unittest.TestCase):
+    def setUp(self) -> None:
+        db._day_bookings_cache.clear()
+
+    def tearDown(self) -> None:
+        db._day_bookings_cache.clear()
+
+    def test_unknown_day_is_none(self) -> None:
+        self.assertIsNone(db._cached_overlap(_DAY, 600, 630))
+
+    def test_empty_day(self) -> None:
+        db._day_bookings_cache[_DAY] = _day()
+        self.assertFalse(db._cached_overlap(_DAY, 600, 630))
+
+    def test_half_open_bounds(self) -> None:
+        db._day_bookings_cache[_DAY] = _day((600, 660))  # 10:00–11:00
+        self.assertFalse(db._cached_overlap(_DAY, 540, 600))  # кінець = початок броні
+        self.assertFalse(db._cached_overlap(_DAY, 660, 720))  # початок = кінець броні
+        self.assertTrue(db._cached_overlap(_DAY, 659, 700))
+        self.assertTrue(db._cached_overlap(_DAY, 590, 601))
+        self.assertTrue(db._cached_overlap(_DAY, 610, 620))  # усередині
+        self.assertTrue(db._cached_overlap(_DAY, 500, 800))  # накриває
+
+    def test_prefix_max_covers_earlier_long_booking(self) -> None:
+        # довга 09:00–12:00 і коротка 10:00–10:30: 11:00 перетинає лише довгу,
+        # а найближча за start_min (10:00) вже закінчилась — рятує max_ends
+        db._day_bookings_cache[_DAY] = _day((540, 720), (600, 630))
+        self.assertTrue(db._cached_overlap(_DAY, 660, 690))
+        self.assertFalse(db._cached_overlap(_DAY, 720, 750))
+
+    def test_gap_between_bookings(self) -> None:
+        db._day_bookings_cache[_DAY] = _day((540, 600), (720, 780))
+        self.assertFalse(db._cached_overlap(_DAY, 600, 720))
+        self.assertTrue(db._cached_overlap(_DAY, 600, 721))
+        self.assertFalse(db._cached_overlap(_DAY, 300, 540))
+        self.assertFalse(db._cached_overlap(_DAY, 780, 900))
+
+
+class InvalidateOnRollbackTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self._old_path = db.DB_PATH
+        db.DB_PATH = os.path.join(self._tmp.name, "barber.db")
+        await db.init_db()
+        await db.upsert_user(5, "Test")
+
+    async def asyncTearDown(self) -> None:
+        await db.close_db()
+        db._day_bookings_cache.clear()
+        db.DB_PATH = self._old_path
+        self._tmp.cleanup()
+
+    async def test_failed_create_drops_cached_day(self) -> None:
+        self.assertEqual(await db.get_active_bookings_for_date(date(2030, 1, 7)), [])
+        self.assertIn(_DAY, db._day_bookings_cache)
+        # reminders падають уже після INSERT -> ROLLBACK; кеш дня все одно скинуто
+        with self.assertRaises(ValueError):
+            await db.create_booking_atomic(
+                client_id=5, date_str=_DAY, time_str="12:00", duration_minutes=30,
+                service_code="beard", service_text="Борода", price_text="150 грн",
+                client_name="Test", phone="380971234567", occupy_minutes=45,
+                reminders=[("client", "not-an-id", "2030-01-07T10:00:00", "2h")],
+            )
+        self.assertNotIn(_DAY, db._day_bookings_cache)
+        self.assertEqual(await db.get_active_bookings_for_date(date(2030, 1, 7)), [])
+        self.assertFalse(db._cached_overlap(_DAY, 720, 765))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+
+os.environ.setdefault("BOT_TOKEN", "123:abc")
+os.environ.setdefault("ADMIN_IDS", "1")
+
+import database as db
+
+# схема з першої версії бота (до occupy_minutes / ui_message_id / generated-колонок)
+_BASELINE_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, full_name TEXT, phone TEXT, is_admin INTEGER DEFAULT 0);
+CREATE TABLE bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    duration_minutes INTEGER NOT NULL,
+    service_code TEXT,
+    service_text TEXT NOT NULL,
+    price_text TEXT NOT NULL,
+    client_name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE days_off (date TEXT PRIMARY KEY);
+CREATE TABLE shop_settings (id INTEGER PRIMARY KEY CHECK (id = 1));
+INSERT INTO shop_settings (id) VALUES (1);
+INSERT INTO users VALUES (5, 'Old', '380971234567', 0);
+INSERT INTO bookings (client_id, date, time, duration_minutes, service_text, price_text,
+                      client_name, phone, status, created_at, updated_at)
+VALUES (5, '2030-01-07', '12:00', 30, 'Борода', '150 грн', 'Old', '380971234567',
+        'approved', '2029-12-01T10:00:00', '2029-12-01T10:00:00');
+"""
+
+
+class BaselineMigrationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self._tmp.name, "barber.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(_BASELINE_SCHEMA)
+        conn.commit()
+        conn.close()
+        self._old_path = db.DB_PATH
+        db.DB_PATH = path
+
+    async def asyncTearDown(self) -> None:
+        await db.close_db()
+        db.DB_PATH = self._old_path
+        self._tmp.cleanup()
+
+    async def test_first_query_migrates_without_init_db(self) -> None:
+        # get_db() сам мігрує: запити по start_min/end_min не падають на старій схемі
+        rows = await db.get_active_bookings_for_date(date(2030, 1, 7))
+        self.assertEqual([r["time"] for r in rows], ["12:00"])
+        # backfill: 30 хв < порогу 40 -> ceil(30 + 5, 15) = 45
+        self.assertEqual(rows[0]["occupy_minutes"], 45)
+        self.assertEqual(await db.count_client_active_requests_for_day(5, "2029-12-01"), 1)
+
+    async def test_booking_paths_after_migration(self) -> None:
+        await db.init_db()
+        with self.assertRaises(ValueError):
+            # 12:30 перетинається зі старою бронню 12:00–12:45
+            await db.create_booking_atomic(
+                client_id=5, date_str="2030-01-07", time_str="12:30", duration_minutes=40,
+                service_code="short", service_text="Коротка стрижка", price_text="350 грн",
+                client_name="Old", phone="380971234567", status="pending", occupy_minutes=45,
+            )
+        booking_id = await db.create_booking_atomic(
+            client_id=5, date_str="2030-01-07", time_str="13:00", duration_minutes=40,
+            service_code="short", service_text="Коротка стрижка", price_text="350 грн",
+            client_name="Old", phone="380971234567", status="pending", occupy_minutes=45,
+        )
+        info = await db.approve_booking_atomic(booking_id)
+        self.assertEqual(info["outcome"], "approved")
+
+    async def test_migration_is_idempotent(self) -> None:
+        await db.init_db()
+        await db.close_db()
+        await db.init_db()
+        cur = await (await db.get_db()).execute("PRAGMA user_version")
+        self.assertEqual((await cur.fetchone())[0], db._SCHEMA_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()